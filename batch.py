@@ -0,0 +1,102 @@
+"""
+Many-to-Many Batch Routing
+- Answers a list of (start, end) queries against one GridStore
+- Queries are grouped by start: one Dijkstra tree serves every target
+  of that source and stops once all of them are settled
+- With an elevators.ElevatorModel attached, each route's rides are booked
+  as it is answered and the tree is regrown for the rest of its group, so
+  later robots see the queue and take the stairs once waiting costs more
+"""
+
+import heapq
+from collections import namedtuple
+from grid_store import INF, NO_PARENT
+
+RouteResult = namedtuple('RouteResult', ['path', 'cost'])
+
+
+def group_by_source(queries):
+    """Map each start cell to the [(query_index, end), ...] that share it"""
+    groups = {}
+    for query_index, (start, end) in enumerate(queries):
+        groups.setdefault(start, []).append((query_index, end))
+    return groups
+
+
+def dijkstra_tree(store, source, targets, observer=None):
+    """Grow a shortest-path tree from ``source`` until every target is settled.
+
+    The tree lives in the store's g / parent arrays for the current epoch.
+    Returns the set of targets that were reached. ``observer`` is called
+    with the index of each settled cell.
+    """
+    store.new_search()
+    g, parent, stamp, epoch = store.g, store.parent, store.stamp, store.epoch
+    neighbors = store.neighbors
+    elevators = store.elevators
+
+    remaining = set(targets)
+    reached = set()
+    store.touch(source)
+    g[source] = 0
+    open_set = [(0, source)]
+
+    while open_set and remaining:
+        d, current = heapq.heappop(open_set)
+        if d > g[current]:
+            continue
+        if observer:
+            observer(current)
+        if current in remaining:
+            remaining.discard(current)
+            reached.add(current)
+
+        edges = neighbors(current) if elevators is None else elevators.neighbors(current, d)
+        for neighbor, cost in edges:
+            if stamp[neighbor] != epoch:
+                store.touch(neighbor)
+            temp_g = d + cost
+            if temp_g < g[neighbor]:
+                g[neighbor] = temp_g
+                parent[neighbor] = current
+                heapq.heappush(open_set, (temp_g, neighbor))
+
+    return reached
+
+
+def trace_path(store, end):
+    """Cell indices from the tree root to ``end`` (current epoch)"""
+    path = []
+    current = end
+    while current != NO_PARENT:
+        path.append(current)
+        current = store.parent[current]
+    return path[::-1]
+
+
+def route_many(store, queries, observer=None):
+    """Solve many (start, end) queries, sharing one search per start.
+
+    Returns a list of RouteResult(path, cost) in query order; unreachable
+    queries get ``RouteResult(None, inf)``. ``observer`` is passed on to
+    every Dijkstra tree.
+    """
+    results = [RouteResult(None, INF)] * len(queries)
+    elevators = store.elevators
+    for source, members in group_by_source(queries).items():
+        if not store.walkable[source]:
+            continue
+        while members:
+            targets = {end for _, end in members if store.walkable[end]}
+            reached = dijkstra_tree(store, source, targets, observer)
+            for position, (query_index, end) in enumerate(members):
+                if end in reached:
+                    path = trace_path(store, end)
+                    results[query_index] = RouteResult(path, store.g[end])
+                    if elevators is not None and elevators.book(path):
+                        # The queue changed; reprice the rest of the group
+                        members = members[position + 1:]
+                        break
+            else:
+                members = ()
+    return results
@@ -0,0 +1,352 @@
+"""
+Search Engine Benchmark Suite
+=============================
+Generates seeded buildings and runs every engine on the same queries,
+printing one JSON record per (building, engine) so results can be diffed
+between releases.
+
+Usage:
+    python benchmark.py --suite quick
+    python benchmark.py --floors 2,20 --sizes 100,500 --densities 0,0.2 -o out.jsonl
+    python benchmark.py --suite quick --compare baseline.jsonl
+    python benchmark.py --suite density --engines field,tree
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from engine import make_store, make_grid, astar_search
+from jps import jump_point_search, jump_tables
+from bidirectional import bidirectional_search
+from batch import route_many, group_by_source
+from hierarchical import HierarchicalPlanner
+from heuristics import PortalBound
+from landmarks import build_landmarks, distances_from
+from grid_store import Paint, INF
+
+try:
+    from distance_field import distance_field, portal_edges
+except ImportError:   # numpy is optional
+    distance_field = None
+
+SCHEMA_VERSION = 1
+
+SUITES = {
+    "quick": dict(floors=[2, 6], sizes=[10, 50], densities=[0.0, 0.2],
+                  layouts=["full"], queries=20),
+    "standard": dict(floors=[2, 6, 20], sizes=[10, 100, 300], densities=[0.0, 0.2],
+                     layouts=["full", "elevator", "stairs"], queries=50),
+    "full": dict(floors=[2, 6, 20, 50], sizes=[10, 100, 500, 1000], densities=[0.0, 0.1, 0.3],
+                 layouts=["full", "elevator", "stairs"], queries=100),
+    # Where vectorized sweeps (field) stop beating the scalar tree as walls
+    # make routes wind
+    "density": dict(floors=[6], sizes=[300], densities=[0.0, 0.1, 0.2, 0.3, 0.4],
+                    layouts=["full"], queries=4),
+}
+
+LAYOUTS = {
+    "full": dict(elevator=True, stairs=True),
+    "elevator": dict(elevator=True, stairs=False),
+    "stairs": dict(elevator=False, stairs=True),
+}
+
+# Node-view grids (make_grid) are only timed up to this many cells
+GRID_BUILD_LIMIT = 1_000_000
+
+# Fields that identify a record when comparing two runs
+KEY_FIELDS = ("engine", "floors", "rows", "cols", "density", "layout", "seed", "queries")
+
+
+def generate_building(floors, rows, cols, density, layout, seed):
+    """Seeded building: default portals plus random walls at ``density``"""
+    store = make_store(floors, rows, cols, **LAYOUTS[layout])
+    threshold = int(density * 256)
+    noise = random.Random(seed).randbytes(store.size)
+    store.walkable[:] = noise.translate(bytes(int(v >= threshold) for v in range(256)))
+    store.paint[:] = store.walkable.translate(bytes([Paint.BARRIER, Paint.EMPTY] + [0] * 254))
+    for index in store.special_cells():
+        store.walkable[index] = 1
+        store.paint[index] = Paint.EMPTY
+    return store
+
+
+def generate_queries(store, count, seed):
+    """Seeded (start, end) pairs on walkable, non-portal cells.
+
+    Raises ValueError if the building has no such cell to draw from.
+    """
+    free = (match.start() for match in re.finditer(rb'\x01', store.walkable))
+    if count and not any(not store.is_special(index) for index in free):
+        raise ValueError("no walkable non-portal cells to place queries on")
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        start, end = rng.randrange(store.size), rng.randrange(store.size)
+        if all(store.walkable[i] and not store.is_special(i) for i in (start, end)):
+            queries.append((start, end))
+    return queries
+
+
+# --- Engines: run(store, queries) -> (expanded, [cost, ...]) ---
+
+def run_astar(store, queries):
+    expanded = []
+    costs = []
+    for start, end in queries:
+        path, _ = astar_search(store, start, end, expanded.append)
+        costs.append(store.g_score(end) if path else INF)
+    return len(expanded), costs
+
+
+def run_bidirectional(store, queries):
+    expanded = []
+    costs = []
+    for start, end in queries:
+        path, _ = bidirectional_search(store, start, end, expanded.append)
+        costs.append(store.g_score(end) if path else INF)
+    return len(expanded), costs
+
+
+def prepare_jps(store):
+    """Offline step for run_jps: build the store's cached jump tables"""
+    jump_tables(store)
+
+
+def run_jps(store, queries):
+    expanded = []
+    costs = []
+    for start, end in queries:
+        path, _ = jump_point_search(store, start, end, expanded.append)
+        costs.append(store.g_score(end) if path else INF)
+    return len(expanded), costs
+
+
+def prepare_alt(store):
+    """Offline step for run_alt: landmark tables for this building"""
+    return build_landmarks(store)
+
+
+def run_alt(store, queries, table):
+    bound = PortalBound(store, table)
+    expanded = []
+    costs = []
+    for start, end in queries:
+        path, _ = astar_search(store, start, end, expanded.append, heuristic=bound)
+        costs.append(store.g_score(end) if path else INF)
+    return len(expanded), costs
+
+
+def prepare_hierarchical(store):
+    """Offline step for run_hierarchical: portal-to-portal floor distances"""
+    return HierarchicalPlanner(store)
+
+
+def run_hierarchical(store, queries, planner):
+    expanded = 0
+    costs = []
+    for start, end in queries:
+        _, cost = planner.search(start, end)
+        expanded += planner.expanded
+        costs.append(cost)
+    return expanded, costs
+
+
+def run_batch(store, queries):
+    expanded = []
+    results = route_many(store, queries, expanded.append)
+    return len(expanded), [result.cost for result in results]
+
+
+def run_field(store, queries):
+    """One distance field per distinct end; every start reads its cost off it"""
+    edges = portal_edges(store)
+    expanded = 0
+    costs = [INF] * len(queries)
+    for end, members in group_by_source([(end, start) for start, end in queries]).items():
+        field = distance_field(store, end, edges)
+        expanded += int((field < INF).sum())
+        for query_index, start in members:
+            costs[query_index] = float(field[start])
+    return expanded, costs
+
+
+def run_tree(store, queries):
+    """Like run_field, but each field is a scalar Dijkstra tree (landmarks.distances_from)"""
+    expanded = 0
+    costs = [INF] * len(queries)
+    for end, members in group_by_source([(end, start) for start, end in queries]).items():
+        tree = distances_from(store, end)
+        expanded += sum(1 for cost in tree if cost < INF)
+        for query_index, start in members:
+            costs[query_index] = tree[start]
+    return expanded, costs
+
+
+ENGINES = {
+    "astar": run_astar,
+    "alt": run_alt,
+    "jps": run_jps,
+    "bidirectional": run_bidirectional,
+    "hierarchical": run_hierarchical,
+    "batch": run_batch,
+}
+
+# Untimed preprocessing; its result is passed to the engine as a third argument.
+# jps keeps nothing: it only builds the jump tables the store caches, which
+# every jump point search reads
+PREPARE = {
+    "alt": prepare_alt,
+    "jps": prepare_jps,
+    "hierarchical": prepare_hierarchical,
+}
+if distance_field is not None:
+    ENGINES["field"] = run_field
+    # Scalar baseline for "field": compare the two rows across densities
+    # to see where sweeps stop paying off
+    ENGINES["tree"] = run_tree
+
+
+def measure(engine, store, queries, memory=True):
+    """Time one engine on a query set; optionally trace its peak memory"""
+    run = ENGINES[engine]
+    prepare_time = None
+    if engine in PREPARE:
+        started = time.perf_counter()
+        prepared = PREPARE[engine](store)
+        prepare_time = round(time.perf_counter() - started, 6)
+        if prepared is not None:
+            run = lambda store, queries, run=run: run(store, queries, prepared)
+
+    started = time.perf_counter()
+    expanded, costs = run(store, queries)
+    wall_time = time.perf_counter() - started
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        run(store, queries)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    found = [cost for cost in costs if cost != INF]
+    return {
+        "expanded": expanded,
+        "wall_time": round(wall_time, 6),
+        "time_per_query": round(wall_time / len(queries), 6) if queries else 0,
+        "peak_memory": peak_memory,
+        "prepare_time": prepare_time,
+        "total_cost": sum(found),
+        "unreachable": len(costs) - len(found),
+    }
+
+
+def run_suite(floors, sizes, densities, layouts, engines, queries, seed, memory=True):
+    """Yield one record per (building, engine)"""
+    for floor_count in floors:
+        for size in sizes:
+            for density in densities:
+                for layout in layouts:
+                    started = time.perf_counter()
+                    store = generate_building(floor_count, size, size, density, layout, seed)
+                    build_time = time.perf_counter() - started
+                    grid_build_time = None
+                    if store.size <= GRID_BUILD_LIMIT:
+                        started = time.perf_counter()
+                        make_grid(floor_count, size, size)
+                        grid_build_time = round(time.perf_counter() - started, 6)
+                    query_set = generate_queries(store, queries, seed)
+                    for engine in engines:
+                        record = {
+                            "schema": SCHEMA_VERSION,
+                            "engine": engine,
+                            "floors": floor_count,
+                            "rows": size,
+                            "cols": size,
+                            "density": density,
+                            "layout": layout,
+                            "seed": seed,
+                            "queries": len(query_set),
+                            "build_time": round(build_time, 6),
+                            "grid_build_time": grid_build_time,
+                            "python": platform.python_version(),
+                        }
+                        record.update(measure(engine, store, query_set, memory))
+                        yield record
+
+
+def compare(records, baseline_path, threshold):
+    """Report records whose time or expansions grew past ``threshold``"""
+    with open(baseline_path) as f:
+        baseline = {tuple(r[k] for k in KEY_FIELDS): r for r in map(json.loads, f) if r}
+    regressions = []
+    for record in records:
+        old = baseline.get(tuple(record[k] for k in KEY_FIELDS))
+        if not old:
+            continue
+        for metric in ("wall_time", "expanded", "total_cost"):
+            if old[metric] and record[metric] > old[metric] * (1 + threshold):
+                regressions.append((record, metric, old[metric], record[metric]))
+    return regressions
+
+
+def parse_list(kind):
+    return lambda text: [kind(item) for item in text.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinding engines")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--floors", type=parse_list(int))
+    parser.add_argument("--sizes", type=parse_list(int), help="rows = cols per floor")
+    parser.add_argument("--densities", type=parse_list(float), help="wall density 0..1")
+    parser.add_argument("--layouts", type=parse_list(str), help=",".join(LAYOUTS))
+    parser.add_argument("--engines", type=parse_list(str), default=list(ENGINES),
+                        help=",".join(ENGINES))
+    parser.add_argument("--queries", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON lines to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative growth counted as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    suite = SUITES[args.suite]
+    unknown = set(args.engines) - set(ENGINES)
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(sorted(unknown))}")
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    records = []
+    try:
+        for record in run_suite(args.floors or suite["floors"],
+                                args.sizes or suite["sizes"],
+                                args.densities if args.densities is not None else suite["densities"],
+                                args.layouts or suite["layouts"],
+                                args.engines,
+                                args.queries or suite["queries"],
+                                args.seed,
+                                memory=not args.no_memory):
+            records.append(record)
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.compare:
+        regressions = compare(records, args.compare, args.threshold)
+        for record, metric, old, new in regressions:
+            key = ", ".join(f"{k}={record[k]}" for k in KEY_FIELDS)
+            print(f"REGRESSION {metric}: {old} -> {new} ({key})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Bidirectional A*
+- Searches forward from the start and backward from the end at the same
+  time; moves cost the same both ways, so the backward search uses the
+  same neighbors
+- Both sides use the averaged potential p(v) = (h(v, end) - h(v, start)) / 2
+  (forward) and -p(v) (backward), which keeps them consistent with each
+  other, so the search can stop as soon as the two smallest open keys add
+  up to the best start-to-end cost seen where the frontiers touched
+- The side with the smaller open set expands next
+"""
+
+from grid_store import Mark, NO_PARENT, INF
+from heuristics import PortalBound, portal_bound
+from priority_queue import IndexedPriorityQueue
+
+
+def bidirectional_search(store, start, end, observer=None, trace=None, heuristic=None):
+    """Bidirectional A* on a GridStore; same arguments and result as
+    engine.astar_search. On success the store's g / parent arrays hold the
+    returned path, so ``store.g_score(end)`` is its cost."""
+    store.new_search()
+    mark = store.mark if trace is None else trace.record
+    if heuristic is None:
+        to_end = portal_bound(store)
+        to_start = PortalBound(store, to_end.landmarks)
+    else:
+        to_end = to_start = heuristic
+
+    g = ({start: 0}, {end: 0})                      # forward, backward
+    parent = ({start: NO_PARENT}, {end: NO_PARENT})
+    sign = (1, -1)
+    open_sets = (IndexedPriorityQueue(), IndexedPriorityQueue())
+    open_sets[0].push(start, 0)
+    open_sets[1].push(end, 0)
+    visited = []
+    neighbors = store.neighbors
+
+    best, meet = (0, start) if start == end else (INF, None)
+
+    while open_sets[0] and open_sets[1] and open_sets[0].min_key() + open_sets[1].min_key() < best:
+        side = 0 if len(open_sets[0]) <= len(open_sets[1]) else 1
+        g_side, g_other, parent_side = g[side], g[1 - side], parent[side]
+        open_set = open_sets[side]
+        current = open_set.pop()
+        g_current = g_side[current]
+
+        for neighbor, cost in neighbors(current):
+            temp_g = g_current + cost
+            if temp_g < g_side.get(neighbor, INF):
+                h_end, h_start = to_end(neighbor, end), to_start(neighbor, start)
+                if h_end == INF or h_start == INF:
+                    continue   # cannot be on any start-to-end route
+                g_side[neighbor] = temp_g
+                parent_side[neighbor] = current
+                if open_set.push(neighbor, temp_g + sign[side] * (h_end - h_start) / 2):
+                    mark(neighbor, Mark.OPEN)
+                    visited.append(neighbor)
+                if neighbor in g_other and temp_g + g_other[neighbor] < best:
+                    best, meet = temp_g + g_other[neighbor], neighbor
+
+        if observer:
+            observer(current)
+
+        if current != start and current != end:
+            mark(current, Mark.CLOSED)
+
+    if meet is None:
+        return None, visited
+
+    path = []
+    cell = meet
+    while cell != NO_PARENT:
+        path.append(cell)
+        cell = parent[0][cell]
+    path.reverse()
+    forward = len(path)
+    cell = parent[1][meet]
+    while cell != NO_PARENT:
+        path.append(cell)
+        cell = parent[1][cell]
+
+    # Leave the path in the store's search arrays, as A* would
+    previous = NO_PARENT
+    for position, cell in enumerate(path):
+        store.touch(cell)
+        store.g[cell] = g[0][cell] if position < forward else best - g[1][cell]
+        store.parent[cell] = previous
+        previous = cell
+    for index in path[1:-1]:
+        mark(index, Mark.PATH)
+    return path, visited
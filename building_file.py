@@ -0,0 +1,151 @@
+"""
+Building Files (binary, versioned)
+- Header: magic, version, floors / rows / cols, edge costs, portal count
+  and (version 2) link count
+- Portal table: index and cell type of every elevator / stairs cell
+- Link table (version 2): each pair of portal cells a robot can move
+  between, once; version 1 files get the built-in links (elevator cells
+  stacked at one row / col, stairs from right edge to next left edge)
+- One bit-packed barrier plane per floor (bit set = wall, most significant
+  bit first, padded to a whole byte), so a 20-floor 1000x1000 building is
+  2.5 MB on disk
+- Files are opened with mmap: the header and tables are read in place,
+  and each plane is expanded straight from the mapped pages into the
+  store's byte-per-cell walkable array (searches index it per cell, so it
+  stays one byte per cell in memory)
+"""
+
+import mmap
+import sys
+from array import array
+from struct import Struct
+from grid_store import GridStore, CellType, Paint, STAIRS_POSITIONS
+
+MAGIC = b"BLD1"
+VERSION = 2
+PREFIX = Struct("<4sH")   # magic, version
+# magic, version, floors, rows, cols, move / elevator / stairs cost, portal count
+# (, link count)
+HEADERS = {1: Struct("<4sHHII3dI"), 2: Struct("<4sHHII3dII")}
+
+# Plane bits as '0' / '1' characters <-> walkable bytes and paint bytes
+_WALL_BITS = bytes.maketrans(b"\x00\x01", b"10")
+_WALKABLE = bytes.maketrans(b"01", b"\x01\x00")
+_PAINT = bytes.maketrans(b"\x00\x01", bytes([Paint.BARRIER, Paint.EMPTY]))
+
+
+def _plane_bytes(plane):
+    return (plane + 7) // 8
+
+
+def _indices(values):
+    """Little-endian uint32 block"""
+    block = array('I', values)
+    if sys.byteorder == "big":
+        block.byteswap()
+    return block.tobytes()
+
+
+def save_building(store, path):
+    """Write the store's walls, portals, links and costs to ``path``"""
+    portals = store.special_cells()
+    links = [(cell, target) for cell, stops in store.elevator_links.items()
+             for target, _ in stops if cell < target]
+    links += [(cell, target) for cell, targets in store.stairs_links.items()
+              for target in targets if cell < target]
+    plane, size = store.plane, _plane_bytes(store.plane)
+    with open(path, "wb") as f:
+        f.write(HEADERS[VERSION].pack(MAGIC, VERSION, store.floors, store.rows, store.cols,
+                                      *store.cost_config(), len(portals), len(links)))
+        f.write(_indices(portals))
+        f.write(bytes(store.cell_type[index] for index in portals))
+        f.write(_indices([cell for link in links for cell in link]))
+        for floor in range(store.floors):
+            first = floor * plane
+            bits = bytes(store.walkable[first:first + plane]).translate(_WALL_BITS)
+            f.write(int(b"1" + bits.ljust(size * 8, b"0"), 2).to_bytes(size + 1, "big")[1:])
+
+
+def load_building(path):
+    """Read a file written by save_building() into a new GridStore.
+
+    Raises ValueError if the file is not a version 1 or 2 building file.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if len(mapped) < PREFIX.size:
+            raise ValueError(f"{path}: truncated building file")
+        magic, version = PREFIX.unpack_from(mapped)
+        if magic != MAGIC or version not in HEADERS:
+            raise ValueError(f"{path}: not a version 1 or 2 building file")
+        header = HEADERS[version]
+        if len(mapped) < header.size:
+            raise ValueError(f"{path}: truncated building file")
+        fields = header.unpack_from(mapped)
+        floors, rows, cols = fields[2:5]
+        move_cost, elevator_cost, stairs_cost = fields[5:8]
+        count, link_count = fields[8], (fields[9] if version > 1 else 0)
+        # Sizes come from the header alone; the file must be exactly that
+        # long before anything is allocated for it. Portal indices are
+        # uint32, so no building has more cells than that
+        plane = rows * cols
+        if not 0 < floors * plane <= 1 << 32:
+            raise ValueError(f"{path}: bad building size {floors}x{rows}x{cols}")
+        size = _plane_bytes(plane)
+        offset = header.size
+        planes = offset + count * 5 + link_count * 8
+        if len(mapped) != planes + floors * size:
+            raise ValueError(f"{path}: truncated building file")
+
+        store = GridStore(floors, rows, cols)
+
+        with memoryview(mapped) as view:
+            for floor in range(floors):
+                start = planes + floor * size
+                packed = int.from_bytes(view[start:start + size], "big") | 1 << size * 8
+                walkable = bin(packed)[3:3 + plane].encode().translate(_WALKABLE)
+                store.walkable[floor * plane:(floor + 1) * plane] = walkable
+            portals, links = array('I'), array('I')
+            portals.frombytes(view[offset:offset + count * 4])
+            kinds = view[offset + count * 4:offset + count * 5].tobytes()
+            links.frombytes(view[offset + count * 5:planes])
+        if sys.byteorder == "big":
+            portals.byteswap()
+            links.byteswap()
+
+    portal_kinds = set(CellType) - {CellType.FLOOR}
+    if version == 1:
+        portal_kinds = {CellType.ELEVATOR, *STAIRS_POSITIONS}
+    for index, kind in zip(portals, kinds):
+        if index >= store.size or kind not in portal_kinds:
+            raise ValueError(f"{path}: bad portal entry ({index}, {kind})")
+    kind_of = dict(zip(portals, kinds))
+    for cell, target in zip(links[::2], links[1::2]):
+        if cell == target or cell not in kind_of or kind_of.get(target) != kind_of[cell]:
+            raise ValueError(f"{path}: bad portal link ({cell}, {target})")
+
+    for index, kind in zip(portals, kinds):
+        if version == 1:
+            # Built-in linking rules, as the store applied them when saved
+            if kind == CellType.ELEVATOR:
+                store.make_elevator(index)
+            else:
+                store.make_stairs(index, STAIRS_POSITIONS[kind])
+        else:
+            store.cell_type[index] = kind
+    # The store's link methods apply the same floor rules as topology.build_store
+    try:
+        for cell, target in zip(links[::2], links[1::2]):
+            if store.cell_type[cell] == CellType.ELEVATOR:
+                store.link_elevator((cell, target))
+            else:
+                store.link_stairs(cell, target, store.cell_type[cell])
+    except ValueError as error:
+        raise ValueError(f"{path}: {error}") from None
+    for index in portals:
+        store.walkable[index] = 1
+    store.paint[:] = store.walkable.translate(_PAINT)
+    # Whole costs come back as ints, so the store's fingerprint is unchanged
+    store.move_cost, store.elevator_cost, store.stairs_cost = (
+        int(cost) if cost.is_integer() else cost
+        for cost in (move_cost, elevator_cost, stairs_cost))
+    return store
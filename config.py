@@ -1,8 +1,10 @@
 """
 Configuration and Color Constants for Robot Pathfinding Simulator
+Display-dependent settings; pure constants live in constants.py
 """
 
 import pygame
+from constants import *
 
 # Initialize pygame to get display info
 pygame.init()
@@ -24,13 +26,6 @@ WINDOW_HEIGHT = max(700, WINDOW_HEIGHT)
 UI_PANEL_HEIGHT = 150
 GRID_HEIGHT = WINDOW_HEIGHT - UI_PANEL_HEIGHT - 60
 
-# Grid configuration
-ROWS = 10
-COLS = 10
-MIN_FLOORS = 2
-MAX_FLOORS = 6
-DEFAULT_FLOORS = 3
-
 # Calculate dimensions
 def calculate_dimensions(floors):
     """Calculate floor width and tile size based on floor count"""
@@ -39,35 +34,6 @@ def calculate_dimensions(floors):
     tile_size = min(floor_width // COLS, GRID_HEIGHT // ROWS)
     return floor_width, tile_size
 
-# --- COLOR PALETTE (Dark Theme) ---
-BG_DARK = (18, 18, 24)
-PANEL_BG = (28, 32, 42)
-GRID_BG = (35, 40, 52)
-BUTTON_BG = (45, 55, 72)
-BUTTON_HOVER = (66, 82, 110)
-BUTTON_ACTIVE = (99, 179, 237)
-ACCENT = (129, 230, 217)
-TEXT_PRIMARY = (255, 255, 255)
-TEXT_SECONDARY = (160, 170, 190)
-
-# Node Colors
-WHITE = (240, 245, 255)
-BLACK = (30, 30, 40)
-GREY = (60, 65, 80)
-GREEN = (72, 207, 173)      # Start
-RED = (252, 92, 101)        # End
-BLUE = (69, 170, 242)       # Elevator
-PURPLE = (165, 94, 234)     # Path
-ORANGE = (253, 150, 68)     # Open/Scanning
-TURQUOISE = (38, 222, 129)  # Closed/Visited
-YELLOW = (254, 211, 48)     # Robot
-STAIRS_COLOR = (255, 159, 243)  # Pink for stairs
-
-# Algorithm costs
-MOVE_COST = 1
-ELEVATOR_COST = 8       # Elevator is faster
-STAIRS_COST = 12        # Stairs take more time
-
 # --- UI SCALING ---
 SCALE_FACTOR = min(WINDOW_HEIGHT / 900, WINDOW_WIDTH / 1400)
 
@@ -0,0 +1,56 @@
+"""
+Display-independent Constants for Robot Pathfinding Simulator
+Grid configuration, color palette and algorithm costs.
+Safe to import without pygame (headless search engine, batch servers).
+"""
+
+# Grid configuration
+ROWS = 10
+COLS = 10
+MIN_FLOORS = 2
+MAX_FLOORS = 6
+DEFAULT_FLOORS = 3
+
+# --- COLOR PALETTE (Dark Theme) ---
+BG_DARK = (18, 18, 24)
+PANEL_BG = (28, 32, 42)
+GRID_BG = (35, 40, 52)
+BUTTON_BG = (45, 55, 72)
+BUTTON_HOVER = (66, 82, 110)
+BUTTON_ACTIVE = (99, 179, 237)
+ACCENT = (129, 230, 217)
+TEXT_PRIMARY = (255, 255, 255)
+TEXT_SECONDARY = (160, 170, 190)
+
+# Node Colors
+WHITE = (240, 245, 255)
+BLACK = (30, 30, 40)
+GREY = (60, 65, 80)
+GREEN = (72, 207, 173)      # Start
+RED = (252, 92, 101)        # End
+BLUE = (69, 170, 242)       # Elevator
+PURPLE = (165, 94, 234)     # Path
+ORANGE = (253, 150, 68)     # Open/Scanning
+TURQUOISE = (38, 222, 129)  # Closed/Visited
+YELLOW = (254, 211, 48)     # Robot
+STAIRS_COLOR = (255, 159, 243)  # Pink for stairs
+
+# Algorithm costs
+MOVE_COST = 1
+ELEVATOR_COST = 8       # Elevator is faster
+STAIRS_COST = 12        # Stairs take more time
+
+# Elevator load model (elevators.py): riders per car, door time per stop
+ELEVATOR_CAPACITY = 4
+ELEVATOR_DWELL = 2
+
+# Landmark (ALT) tables: landmarks per building, and where tables are kept
+LANDMARK_COUNT = 8
+LANDMARK_DIR = "landmarks"
+
+# Building file used by the Save / Load buttons
+BUILDING_FILE = "building.bld"
+
+# Search replay: frame rate and longest replay, however large the search
+REPLAY_FPS = 30
+REPLAY_MAX_SECONDS = 3
@@ -0,0 +1,168 @@
+"""
+Distance Fields (NumPy)
+- Cost-to-goal for every cell of the building in one pass, e.g. to send
+  every robot to the same charging station
+- Moves within a floor are relaxed as whole-array shifts; elevator and
+  stairs links are a small sparse edge list relaxed with np.minimum.at
+- A sweep only scans the rows and columns holding cells the last sweep
+  improved, and only carries the wavefront along straight runs, so
+  winding routes need many sweeps; once they improve only a few cells, a
+  heap search from those cells finishes the field
+- A path from any start is read off the field by gradient descent
+- Requires numpy (pip install numpy); nothing else depends on this module
+"""
+
+import heapq
+import numpy as np
+from grid_store import INF
+
+# Hand over to the heap search once a sweep improves fewer than
+# 1 / SETTLE_SHARE of the cells (a sweep costs about as much as a heap
+# search over that many cells)
+SETTLE_SHARE = 32
+
+
+def as_arrays(store):
+    """Zero-copy (floors, rows, cols) views of walkable and cell_type"""
+    shape = (store.floors, store.rows, store.cols)
+    walkable = np.frombuffer(store.walkable, dtype=np.uint8).reshape(shape)
+    cell_type = np.frombuffer(store.cell_type, dtype=np.uint8).reshape(shape)
+    return walkable, cell_type
+
+
+def portal_edges(store):
+    """Elevator / stairs links as (sources, targets, costs) arrays"""
+    sources, targets, costs = [], [], []
+    plane = store.plane
+    for index in store.special_cells():
+        for neighbor, cost in store.neighbors(index):
+            if neighbor // plane != index // plane:
+                sources.append(index)
+                targets.append(neighbor)
+                costs.append(cost)
+    return (np.array(sources, dtype=np.intp), np.array(targets, dtype=np.intp),
+            np.array(costs, dtype=np.float64))
+
+
+def _run_scan(dist, base, limit, axis):
+    """Relax every cell from all earlier cells of its barrier-free run.
+
+    Along one axis a run costs ``move * (i - j)`` from cell j to cell i, so
+    the best predecessor is a running minimum of ``dist - move * position``.
+    ``base`` also adds ``limit`` per barrier passed, which keeps earlier runs
+    from ever winning; anything still at or above ``limit`` is unreachable.
+    """
+    best = np.minimum.accumulate(dist - base, axis=axis)
+    best += base
+    best[best >= limit] = INF
+    np.minimum(dist, best, out=dist)
+
+
+def distance_field(store, goal, edges=None):
+    """Cost from every cell to ``goal`` as a flat float array (inf = unreachable).
+
+    Moves cost the same in both directions, so this is also the cost from
+    ``goal`` to every cell. ``edges`` may be a cached portal_edges(store).
+    """
+    walkable, _ = as_arrays(store)
+    blocked = walkable == 0
+    move_cost = float(store.move_cost)
+    sources, targets, costs = portal_edges(store) if edges is None else edges
+
+    dist = np.full(walkable.shape, INF)
+    flat = dist.reshape(-1)
+    if not store.walkable[goal]:
+        return flat
+    flat[goal] = 0
+
+    # No shortest path is longer than every cell times the dearest edge
+    limit = (store.size + 1) * max(move_cost, costs.max() if len(costs) else 0, 1)
+    scans = {1: [], 2: []}
+    for axis in (1, 2):
+        for flip in (False, True):
+            view = np.flip(dist, axis) if flip else dist
+            shape = [1, 1, 1]
+            shape[axis] = view.shape[axis]
+            position = np.arange(view.shape[axis], dtype=np.float64).reshape(shape)
+            runs = np.cumsum(np.flip(blocked, axis) if flip else blocked, axis=axis)
+            scans[axis].append((view, move_cost * position + runs * limit))
+
+    # Each sweep carries the wavefront along the straight runs through the
+    # cells the last sweep improved, in all four directions, and across
+    # every portal. Winding routes need many sweeps; once they improve few
+    # cells and the wavefront stops growing, a heap search finishes it
+    frontier = np.array([goal])
+    previous = 0
+    while True:
+        before = flat.copy()
+        _sweep(dist, before.reshape(dist.shape), scans, frontier, limit)
+        if len(sources):
+            np.minimum.at(flat, targets, flat[sources] + costs)
+        dist[blocked] = INF
+        frontier = np.flatnonzero(flat < before)
+        if len(frontier) * SETTLE_SHARE < store.size and len(frontier) <= previous:
+            _settle(store, flat, frontier.tolist())
+            return flat
+        previous = len(frontier)
+
+
+def _sweep(dist, before, scans, frontier, limit):
+    """Run the four scans over the columns, then the rows, holding a changed cell"""
+    floors, rows, cols = dist.shape
+    floor, rest = np.divmod(frontier, rows * cols)
+    row, col = np.divmod(rest, cols)
+    for f in np.unique(floor).tolist():
+        on_floor = floor == f
+        first_row, last_row = row[on_floor].min(), row[on_floor].max() + 1
+        first_col, last_col = col[on_floor].min(), col[on_floor].max() + 1
+        columns = (slice(f, f + 1), slice(None), slice(first_col, last_col))
+        for view, base in scans[1]:
+            _run_scan(view[columns], base[columns], limit, 1)
+        # Rows the column scans changed need their row scans too
+        changed = np.flatnonzero((dist[columns] < before[columns]).any(axis=2)[0])
+        if len(changed):
+            first_row, last_row = min(first_row, changed[0]), max(last_row, changed[-1] + 1)
+        lines = (slice(f, f + 1), slice(first_row, last_row), slice(None))
+        for view, base in scans[2]:
+            _run_scan(view[lines], base[lines], limit, 2)
+
+
+def _settle(store, flat, frontier):
+    """Finish ``flat`` with a heap search from the cells the last sweep improved.
+
+    A sweep relaxes every edge out of a cell it left unchanged, so only
+    the improved cells can still lower a neighbor.
+    """
+    dist = flat.tolist()
+    queue = [(dist[cell], cell) for cell in frontier]
+    heapq.heapify(queue)
+    neighbors = store.neighbors
+    while queue:
+        d, current = heapq.heappop(queue)
+        if d > dist[current]:
+            continue
+        for neighbor, cost in neighbors(current):
+            candidate = d + cost
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                heapq.heappush(queue, (candidate, neighbor))
+    flat[:] = dist
+
+
+def descend(store, field, start):
+    """Follow the field downhill from ``start``; returns cell indices or None"""
+    if field[start] == INF:
+        return None
+    path = [start]
+    current = start
+    while field[current] > 0:
+        best, best_cost = None, field[current]
+        for neighbor, cost in store.neighbors(current):
+            candidate = cost + field[neighbor]
+            if candidate <= best_cost:
+                best, best_cost = neighbor, candidate
+        if best is None:
+            return None
+        path.append(best)
+        current = best
+    return path
@@ -0,0 +1,124 @@
+"""
+Elevator Load Model
+- A flat ELEVATOR_COST per floor ignores queueing; under load the wait for
+  a car dominates. This model adds a time-dependent expected wait to
+  every elevator ride: door dwell plus the time to clear the queue ahead
+- One queue per car (the elevator cells linked to each other, keyed by the
+  lowest of them, so a local and an express car in one row / col keep
+  separate queues). Riders are booked at the time they reach the car; it
+  clears ``capacity`` riders per ``cycle`` (a loaded trip and the ride back)
+- The queue drains continuously, so waiting longer never gets a robot out
+  sooner (FIFO): searches that use arrival time as cost stay exact, and
+  the wall-free heuristics stay admissible since waits are never negative
+- Opt-in: attach() sets ``store.elevators``; engine.astar_search and
+  batch.route_many then price rides with it (other modes use flat costs)
+"""
+
+from bisect import bisect_right
+from constants import *
+from grid_store import CellType
+
+
+class Shaft:
+    """Queue of riders for one elevator car"""
+
+    def __init__(self, rate):
+        self.rate = rate        # riders the car clears per time unit
+        self.bookings = []      # sorted times riders reached the shaft
+        self.backlog = []       # riders queued just after each booking
+
+    def queue(self, time):
+        """Riders still waiting at ``time``"""
+        last = bisect_right(self.bookings, time) - 1
+        if last < 0:
+            return 0
+        left = self.backlog[last] - self.rate * (time - self.bookings[last])
+        return left if left > 0 else 0
+
+    def book(self, time):
+        position = bisect_right(self.bookings, time)
+        self.bookings.insert(position, time)
+        # Backlogs from the new booking on change; recompute them
+        del self.backlog[position:]
+        for later in range(position, len(self.bookings)):
+            left = 0
+            if later:
+                gap = self.bookings[later] - self.bookings[later - 1]
+                left = max(self.backlog[later - 1] - self.rate * gap, 0)
+            self.backlog.append(left + 1)
+
+
+class ElevatorModel:
+    """Capacity, door dwell and a queue per car, for one store"""
+
+    def __init__(self, store, capacity=ELEVATOR_CAPACITY, dwell=ELEVATOR_DWELL, cycle=None):
+        self.store = store
+        self.capacity = capacity
+        self.dwell = dwell
+        if cycle is None:
+            # Doors at both ends, a ride over half the building and back
+            cycle = 2 * dwell + store.elevator_cost * max(store.floors - 1, 1)
+        self.cycle = cycle
+        self.shafts = {}   # car's lowest elevator cell -> Shaft
+        self.now = 0       # time searches start at
+
+    def attach(self):
+        self.store.elevators = self
+        return self
+
+    def detach(self):
+        if self.store.elevators is self:
+            self.store.elevators = None
+
+    def car(self, index):
+        """The car serving elevator cell ``index``, as its lowest linked cell"""
+        links = self.store.elevator_links.get(index)
+        return min(index, links[0][0]) if links else index
+
+    def shaft(self, index):
+        key = self.car(index)
+        if key not in self.shafts:
+            self.shafts[key] = Shaft(self.capacity / self.cycle)
+        return self.shafts[key]
+
+    def wait(self, index, time):
+        """Expected time from reaching elevator cell ``index`` to riding off"""
+        shaft = self.shafts.get(self.car(index))
+        if shaft is None:
+            return self.dwell
+        return self.dwell + shaft.queue(time) / shaft.rate
+
+    def neighbors(self, index, elapsed):
+        """store.neighbors for a robot there ``elapsed`` after ``now``"""
+        store = self.store
+        if store.cell_type[index] != CellType.ELEVATOR:
+            yield from store.neighbors(index)
+            return
+        plane = store.plane
+        wait = self.wait(index, self.now + elapsed)
+        for neighbor, cost in store.neighbors(index):
+            if neighbor // plane != index // plane:
+                cost += wait
+            yield neighbor, cost
+
+    def book(self, path, start_time=None):
+        """Queue the path's elevator rides; returns how many it booked.
+
+        ``start_time`` (when the path starts) defaults to ``now``. Raises
+        ValueError if a step of ``path`` is not a move to a neighbor.
+        """
+        store = self.store
+        plane = store.plane
+        time = self.now if start_time is None else start_time
+        rides = 0
+        for cell, following in zip(path, path[1:]):
+            for neighbor, cost in self.neighbors(cell, time - self.now):
+                if neighbor == following:
+                    break
+            else:
+                raise ValueError(f"path step {cell} -> {following} is not a move")
+            if following // plane != cell // plane and store.cell_type[cell] == CellType.ELEVATOR:
+                self.shaft(cell).book(time)
+                rides += 1
+            time += cost
+        return rides
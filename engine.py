@@ -0,0 +1,235 @@
+"""
+Headless Search Engine
+- Pure-Python A* search over an array-backed GridStore (no pygame / SDL)
+- Elevator: Can go to ANY floor its car serves directly (1→2, 1→3, 2→3, etc.)
+- Stairs: Can ONLY go to adjacent floor (floor by floor)
+- Portals come from a topology description (see topology.py)
+- Node is a thin view of one store cell, kept for the UI
+- Visualizers plug in through the optional ``observer`` hook
+"""
+
+from priority_queue import IndexedPriorityQueue
+from heuristics import portal_bound
+from jps import jump_point_search
+from bidirectional import bidirectional_search
+from grid_store import CellType, Paint, Mark, STAIRS_POSITIONS, NO_PARENT, INF
+from topology import build_store, default_topology
+
+
+class Node:
+    """View of a single cell in a GridStore"""
+
+    __slots__ = ('store', 'index', 'row', 'col', 'floor')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self.row, self.col, self.floor = store.position(index)
+
+    @property
+    def color(self):
+        return self.store.color(self.index)
+
+    @property
+    def is_elevator(self):
+        return self.store.cell_type[self.index] == CellType.ELEVATOR
+
+    @property
+    def is_stairs(self):
+        return self.store.cell_type[self.index] not in (CellType.FLOOR, CellType.ELEVATOR)
+
+    @property
+    def stairs_position(self):
+        return STAIRS_POSITIONS.get(self.store.cell_type[self.index])
+
+    @property
+    def g(self):
+        return self.store.g_score(self.index)
+
+    @property
+    def neighbors(self):
+        """(node, cost) pairs, generated from the store on demand"""
+        views = self.store.views
+        return [(views[index] if views else Node(self.store, index), cost)
+                for index, cost in self.store.neighbors(self.index)]
+
+    @property
+    def parent(self):
+        parent = self.store.parent_of(self.index)
+        if parent == NO_PARENT:
+            return None
+        return self.store.views[parent] if self.store.views else Node(self.store, parent)
+
+    def get_pos(self):
+        return self.row, self.col, self.floor
+
+    def is_barrier(self):
+        return not self.store.walkable[self.index]
+
+    def is_special(self):
+        return self.store.is_special(self.index)
+
+    def reset(self):
+        self.store.reset_cell(self.index)
+
+    def make_start(self):
+        self.store.set_paint(self.index, Paint.START)
+
+    def make_closed(self):
+        self.store.mark(self.index, Mark.CLOSED)
+
+    def make_open(self):
+        self.store.mark(self.index, Mark.OPEN)
+
+    def make_barrier(self):
+        self.store.paint_unprotected(self.index, Paint.BARRIER)
+
+    def make_end(self):
+        self.store.set_paint(self.index, Paint.END)
+
+    def make_path(self):
+        self.store.mark(self.index, Mark.PATH)
+
+    def make_elevator(self):
+        self.store.make_elevator(self.index)
+
+    def make_stairs(self, position):
+        self.store.make_stairs(self.index, position)
+
+
+def astar_search(store, start, end, observer=None, trace=None, heuristic=None):
+    """A* directly on a GridStore, using integer cell indices.
+
+    Neighbors are generated lazily from the store as cells are expanded,
+    and search state is reset by bumping the store epoch, so starting a
+    query costs O(1) regardless of building size. Returns ``(path, visited)``
+    as lists of indices (``path`` is None when the end is unreachable).
+    ``observer`` is called with the index of each expanded cell. With a
+    ``trace`` (see search_trace.SearchTrace) the open / closed / path marks
+    are recorded there instead of being painted on the store.
+    ``heuristic(cell, goal)`` defaults to the store's heuristics.PortalBound;
+    cells it rates infinite cannot reach the goal and are never queued.
+    With an elevators.ElevatorModel attached, rides include the expected
+    wait at the time the search reaches the shaft.
+    """
+    store.new_search()
+    mark = store.mark if trace is None else trace.record
+    g = store.g
+    parent = store.parent
+    stamp = store.stamp
+    epoch = store.epoch
+    if heuristic is None:
+        heuristic = portal_bound(store)
+
+    # Key is (f, h): among equal f the cell nearer the goal comes first,
+    # which keeps searches on open floors narrow
+    open_set = IndexedPriorityQueue()
+    h_start = heuristic(start, end)
+    open_set.push(start, (h_start, h_start))
+    store.touch(start)
+    g[start] = 0
+    visited = []
+
+    neighbors = store.neighbors
+    elevators = store.elevators
+
+    while open_set:
+        current = open_set.pop()
+
+        if current == end:
+            path = []
+            while current != NO_PARENT:
+                path.append(current)
+                current = parent[current]
+            path.reverse()
+            for index in path[1:-1]:
+                mark(index, Mark.PATH)
+            return path, visited
+
+        g_current = g[current]
+        edges = neighbors(current) if elevators is None else elevators.neighbors(current, g_current)
+        for neighbor, cost in edges:
+            temp_g = g_current + cost
+
+            if stamp[neighbor] != epoch:
+                store.touch(neighbor)
+
+            if temp_g < g[neighbor]:
+                h_neighbor = heuristic(neighbor, end)
+                if h_neighbor == INF:
+                    continue
+                parent[neighbor] = current
+                g[neighbor] = temp_g
+
+                if open_set.push(neighbor, (temp_g + h_neighbor, h_neighbor)):
+                    mark(neighbor, Mark.OPEN)
+                    visited.append(neighbor)
+
+        if observer:
+            observer(current)
+
+        if current != start:
+            mark(current, Mark.CLOSED)
+
+    return None, visited
+
+
+def mark_path(store, path):
+    """Show a known path as a fresh search result (e.g. from a cache)"""
+    store.new_search()
+    for index in path or ():
+        store.mark(index, Mark.PATH)
+
+
+# Searches with the astar_search signature, by name
+SEARCH_MODES = {
+    "astar": astar_search,
+    "jps": jump_point_search,
+    "bidirectional": bidirectional_search,
+}
+
+
+def astar_algorithm(grid, start, end, floors, rows, cols, observer=None, trace=None,
+                    heuristic=None, mode="astar"):
+    """A* over the node grid, run on the backing store.
+
+    ``observer`` is an optional callable invoked with the current node after
+    every expansion; front-ends use it to redraw or pump their event loop.
+    ``trace`` and ``heuristic`` are passed on to the search, which ``mode``
+    picks from SEARCH_MODES ("astar", "jps", "bidirectional").
+    """
+    store = start.store
+    views = store.views
+    callback = (lambda index: observer(views[index])) if observer else None
+
+    search = SEARCH_MODES[mode]
+    path, visited = search(store, start.index, end.index, callback, trace, heuristic)
+    visited_nodes = [views[index] for index in visited]
+    if path is None:
+        return None, visited_nodes
+    return [views[index] for index in path], visited_nodes
+
+
+def make_store(floors, rows, cols, elevator=True, stairs=True):
+    """Create a store with elevator (center) and stairs (at junctions)
+
+    ``elevator`` / ``stairs`` switch either kind of portal off, e.g. for
+    benchmarking stairs-only or elevator-only buildings. Other layouts are
+    built from a description with topology.build_store.
+    """
+    return build_store(default_topology(floors, rows, cols, elevator, stairs))
+
+
+def make_grid(floors, rows, cols, node_factory=Node, store=None):
+    """Create a node grid (grid[floor][row][col]) over a fresh store
+
+    ``node_factory(store, index)`` builds each view, so front-ends can
+    supply a drawable Node subclass. An existing ``store`` (e.g. one read by
+    building_file.load_building) is used instead of a fresh one.
+    """
+    if store is None:
+        store = make_store(floors, rows, cols)
+    store.views = [node_factory(store, index) for index in range(store.size)]
+    return [[store.views[(f * rows + r) * cols:(f * rows + r + 1) * cols]
+             for r in range(rows)]
+            for f in range(floors)]
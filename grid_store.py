@@ -0,0 +1,328 @@
+"""
+Array-backed Grid Store
+- One flat array per attribute instead of one Python object per cell
+- Cell index = (floor * rows + row) * cols + col
+- Walkability / cell type / paint are bytes, g-score and parent are
+  integer-indexed arrays used directly by the search engine
+- Search state is generation-stamped: a new search bumps the epoch and
+  any cell whose stamp is older reads as untouched (g = infinity)
+- Floor changes come from an explicit portal adjacency index (elevator
+  and stairs links per cell), filled by make_elevator / make_stairs or a
+  topology description (see topology.py)
+"""
+
+import hashlib
+import re
+from array import array
+from enum import IntEnum
+from constants import *
+
+INF = float('inf')
+NO_PARENT = -1
+
+
+class CellType(IntEnum):
+    """What occupies a cell, independent of how it is painted"""
+    FLOOR = 0
+    ELEVATOR = 1
+    STAIRS_TOP = 2
+    STAIRS_BOTTOM = 3
+    STAIRS = 4          # stairs placed by a topology description
+
+
+class Paint(IntEnum):
+    """Persistent display state of a cell, set by the user"""
+    EMPTY = 0
+    BARRIER = 1
+    START = 2
+    END = 3
+
+
+class Mark(IntEnum):
+    """Per-search display state, valid only for the current epoch"""
+    NONE = 0
+    OPEN = 1
+    CLOSED = 2
+    PATH = 3
+
+
+STAIRS_TYPES = {"top": CellType.STAIRS_TOP, "bottom": CellType.STAIRS_BOTTOM}
+STAIRS_POSITIONS = {kind: position for position, kind in STAIRS_TYPES.items()}
+
+# Color of an unpainted cell, by cell type
+BASE_COLORS = {
+    CellType.FLOOR: WHITE,
+    CellType.ELEVATOR: BLUE,
+    CellType.STAIRS_TOP: STAIRS_COLOR,
+    CellType.STAIRS_BOTTOM: STAIRS_COLOR,
+    CellType.STAIRS: STAIRS_COLOR,
+}
+
+PAINT_COLORS = {
+    Paint.BARRIER: BLACK,
+    Paint.START: GREEN,
+    Paint.END: RED,
+}
+
+MARK_COLORS = {
+    Mark.NONE: WHITE,
+    Mark.OPEN: ORANGE,
+    Mark.CLOSED: TURQUOISE,
+    Mark.PATH: PURPLE,
+}
+
+# Stamps are 32-bit; wrap back to 1 before overflowing
+MAX_EPOCH = 2 ** 32 - 1
+
+
+class GridStore:
+    """Compact storage for a multi-floor building grid"""
+
+    def __init__(self, floors, rows, cols, walkable=None, cell_type=None):
+        """``walkable`` / ``cell_type`` may be existing byte buffers (e.g. shared
+        or mapped memory) to build the store on without copying them."""
+        self.floors = floors
+        self.rows = rows
+        self.cols = cols
+        self.plane = rows * cols
+        self.size = floors * self.plane
+        self.walkable = bytearray(b'\x01') * self.size if walkable is None else walkable
+        self.cell_type = bytearray(self.size) if cell_type is None else cell_type
+        self.paint = bytearray(self.size)
+        self.mark_state = bytearray(self.size)
+        self.g = array('d', [INF]) * self.size
+        self.parent = array('i', [NO_PARENT]) * self.size
+        # g / parent / mark_state are only valid where stamp == epoch
+        self.stamp = array('I', [0]) * self.size
+        self.epoch = 1
+        # Bumped whenever walkability or cell type changes on a floor
+        self.floor_versions = [0] * floors
+        # Called as listener(index, walkable) when a cell's walkability flips
+        self.listeners = []
+        # Portal adjacency: elevator cell -> [(cell, floors apart)], and
+        # stairs cell -> [cell one floor up or down]
+        self.elevator_links = {}
+        self.stairs_links = {}
+        # Edge costs, per store so planners can compare cost configurations
+        self.move_cost = MOVE_COST
+        self.elevator_cost = ELEVATOR_COST
+        self.stairs_cost = STAIRS_COST
+        # Node views, filled in when a node grid is built on top of the store
+        self.views = None
+        # Shared heuristics.PortalBound, built on first use by the engine
+        self.portal_bound = None
+        # landmarks.LandmarkTable attached to this building, if any
+        self.landmarks = None
+        # Shared jps.JumpTables, built on first jump point search
+        self.jump_tables = None
+        # elevators.ElevatorModel pricing elevator queues, if attached
+        self.elevators = None
+        # Cells whose color may have changed, when change tracking is on
+        self.dirty = None
+        self.marked = None
+
+    def cost_config(self):
+        return self.move_cost, self.elevator_cost, self.stairs_cost
+
+    def fingerprint(self):
+        """Hex digest of everything routes depend on: size, walls, portals, costs"""
+        digest = hashlib.sha256(repr((self.floors, self.rows, self.cols,
+                                      self.cost_config())).encode())
+        digest.update(self.walkable)
+        digest.update(self.cell_type)
+        for links in (self.elevator_links, self.stairs_links):
+            digest.update(repr(sorted((cell, sorted(targets))
+                                      for cell, targets in links.items())).encode())
+        return digest.hexdigest()
+
+    def index(self, row, col, floor):
+        return (floor * self.rows + row) * self.cols + col
+
+    def position(self, index):
+        """(row, col, floor) of a cell, same order as Node.get_pos"""
+        floor, rest = divmod(index, self.plane)
+        row, col = divmod(rest, self.cols)
+        return row, col, floor
+
+    def special_cells(self):
+        """Indices of every elevator / stairs cell, in index order"""
+        return [match.start() for match in re.finditer(rb'[^\x00]', self.cell_type)]
+
+    def is_special(self, index):
+        return self.cell_type[index] != CellType.FLOOR
+
+    def is_protected(self, index):
+        """Start, end, elevator and stairs keep their color"""
+        return (self.cell_type[index] != CellType.FLOOR
+                or self.paint[index] in (Paint.START, Paint.END))
+
+    def color(self, index):
+        paint = self.paint[index]
+        if paint != Paint.EMPTY:
+            return PAINT_COLORS[paint]
+        kind = self.cell_type[index]
+        if kind != CellType.FLOOR:
+            return BASE_COLORS[kind]
+        return MARK_COLORS[self.mark_of(index)]
+
+    def track_changes(self):
+        """Start recording which cells change color (for renderers)"""
+        self.dirty = set()
+        self.marked = set()
+
+    def drain_dirty(self):
+        """Cells whose color may have changed since the last call"""
+        cells = self.dirty
+        self.dirty = set()
+        return cells
+
+    def set_paint(self, index, paint):
+        self.paint[index] = paint
+        if self.dirty is not None:
+            self.dirty.add(index)
+        walkable = paint != Paint.BARRIER
+        if self.walkable[index] != walkable:
+            self.walkable[index] = walkable
+            self.floor_versions[index // self.plane] += 1
+            for listener in self.listeners:
+                listener(index, walkable)
+
+    def paint_unprotected(self, index, paint):
+        """Paint a cell unless it is protected"""
+        if not self.is_protected(index):
+            self.set_paint(index, paint)
+
+    def reset_cell(self, index):
+        self.set_paint(index, Paint.EMPTY)
+        self.stamp[index] = 0
+
+    # --- Generation-stamped search state ---
+
+    def new_search(self):
+        """Invalidate all search state in O(1) by bumping the epoch"""
+        self.epoch += 1
+        if self.dirty is not None:
+            # Marks of the previous search disappear with the epoch
+            self.dirty |= self.marked
+            self.marked = set()
+        if self.epoch > MAX_EPOCH:
+            self.stamp = array('I', [0]) * self.size
+            self.epoch = 1
+
+    def touch(self, index):
+        """Bring a cell's search state into the current epoch"""
+        if self.stamp[index] != self.epoch:
+            self.stamp[index] = self.epoch
+            self.g[index] = INF
+            self.parent[index] = NO_PARENT
+            self.mark_state[index] = Mark.NONE
+
+    def g_score(self, index):
+        return self.g[index] if self.stamp[index] == self.epoch else INF
+
+    def parent_of(self, index):
+        return self.parent[index] if self.stamp[index] == self.epoch else NO_PARENT
+
+    def mark_of(self, index):
+        return self.mark_state[index] if self.stamp[index] == self.epoch else Mark.NONE
+
+    def mark(self, index, mark):
+        """Record a search mark (open / closed / path) unless protected"""
+        if not self.is_protected(index):
+            self.touch(index)
+            self.mark_state[index] = mark
+            if self.dirty is not None:
+                self.dirty.add(index)
+                self.marked.add(index)
+
+    # --- Portals ---
+
+    def _make_portal(self, index, kind):
+        self.cell_type[index] = kind
+        self.set_paint(index, Paint.EMPTY)
+        self.floor_versions[index // self.plane] += 1
+
+    def link_elevator(self, cells):
+        """One elevator car stopping at ``cells`` (one per floor it serves).
+
+        Raises ValueError unless the stops sit at one row / col on distinct floors.
+        """
+        plane = self.plane
+        cells = sorted(cells)
+        if len({index % plane for index in cells}) > 1 or len(set(cells)) < len(cells):
+            raise ValueError(f"elevator stops {cells} are not one per floor of a shaft")
+        for index in cells:
+            self._make_portal(index, CellType.ELEVATOR)
+        for index in cells:
+            # A stop served by several cars (e.g. local and express) keeps all links
+            targets = dict(self.elevator_links.get(index, ()))
+            targets.update((other, abs(other // plane - index // plane))
+                           for other in cells if other != index)
+            self.elevator_links[index] = sorted(targets.items())
+
+    def link_stairs(self, lower, upper, kind=CellType.STAIRS):
+        """A flight of stairs from ``lower`` up to ``upper`` on the next floor.
+
+        Raises ValueError if ``upper`` is not on the floor above ``lower``.
+        """
+        if upper // self.plane - lower // self.plane != 1:
+            raise ValueError(f"stairs {lower} -> {upper} do not climb exactly one floor")
+        for index, other in ((lower, upper), (upper, lower)):
+            if self.cell_type[index] != kind:
+                self._make_portal(index, kind)
+            targets = self.stairs_links.setdefault(index, [])
+            if other not in targets:
+                targets.append(other)
+
+    def make_elevator(self, index):
+        """Elevator cell; it joins the elevator cells at the same row / col"""
+        plane = self.plane
+        shaft = [cell for cell in range(index % plane, self.size, plane)
+                 if cell == index or self.cell_type[cell] == CellType.ELEVATOR]
+        self.link_elevator(shaft)
+
+    def make_stairs(self, index, position):
+        """Edge stairs: the right edge of a floor leads to the left edge of
+        the next floor, same row, between stairs of the same position"""
+        kind = STAIRS_TYPES[position]
+        self._make_portal(index, kind)
+        floor, rest = divmod(index, self.plane)
+        col = rest % self.cols
+        if col == self.cols - 1 and floor < self.floors - 1:
+            lower, upper = index, index + self.plane - (self.cols - 1)
+        elif col == 0 and floor > 0:
+            lower, upper = index - self.plane + (self.cols - 1), index
+        else:
+            return
+        if self.cell_type[lower] == kind and self.cell_type[upper] == kind:
+            self.link_stairs(lower, upper, kind)
+
+    def neighbors(self, index):
+        """Yield (neighbor_index, cost) - in-floor moves, then any portal links"""
+        rows, cols, plane = self.rows, self.cols, self.plane
+        row, col = divmod(index % plane, cols)
+        walkable = self.walkable
+        move_cost = self.move_cost
+
+        # Standard 4-directional movement
+        if row < rows - 1 and walkable[index + cols]:
+            yield index + cols, move_cost
+        if row > 0 and walkable[index - cols]:
+            yield index - cols, move_cost
+        if col < cols - 1 and walkable[index + 1]:
+            yield index + 1, move_cost
+        if col > 0 and walkable[index - 1]:
+            yield index - 1, move_cost
+
+        kind = self.cell_type[index]
+
+        # ELEVATOR - any floor its car serves (skip floors allowed)
+        if kind == CellType.ELEVATOR:
+            elevator_cost = self.elevator_cost
+            for target, floors_apart in self.elevator_links.get(index, ()):
+                yield target, elevator_cost * floors_apart
+
+        # STAIRS - one floor up or down
+        elif kind != CellType.FLOOR:
+            for target in self.stairs_links.get(index, ()):
+                yield target, self.stairs_cost
@@ -0,0 +1,125 @@
+"""
+Search Heuristics
+- PortalBound: the exact cost between two cells of the same building with
+  every wall removed. Walls only ever make routes longer, so this is an
+  admissible and consistent lower bound, and it knows where the elevator
+  and stairs actually are and what each floor change really costs
+  * per goal, a small Dijkstra over the portal cells gives each portal's
+    wall-free cost to the goal
+  * per cell, the bound is the cheapest Manhattan walk to a portal on its
+    floor plus that portal's cost (or the straight walk on the goal floor)
+- Optional landmark (ALT) tables tighten it further: the larger of the two
+  lower bounds is used
+- All bounds take cell indices, h(cell, goal), like incremental.py
+"""
+
+import heapq
+from grid_store import INF
+
+
+class PortalBound:
+    """Wall-free cost between two cells of a store, as a search heuristic"""
+
+    def __init__(self, store, landmarks=None):
+        self.store = store
+        self.landmarks = landmarks
+        self.layout = None
+        self.goal = None
+        self.refresh()
+
+    def refresh(self):
+        """Re-read portal positions and costs if the building changed"""
+        store = self.store
+        layout = (tuple(store.floor_versions), store.cost_config())
+        if layout == self.layout:
+            return
+        self.layout = layout
+        self.goal = None
+
+        plane = store.plane
+        self.floor_portals = [[] for _ in range(store.floors)]
+        self.vertical = {}   # portal -> [(other floor's portal, cost)]
+        for index in store.special_cells():
+            floor = index // plane
+            links = [(other, cost) for other, cost in store.neighbors(index)
+                     if other // plane != floor]
+            if links:
+                self.vertical[index] = links
+                self.floor_portals[floor].append(index)
+
+    def _walk(self, a, b):
+        """Wall-free cost between two cells on the same floor"""
+        cols = self.store.cols
+        row_a, col_a = divmod(a % self.store.plane, cols)
+        row_b, col_b = divmod(b % self.store.plane, cols)
+        return (abs(row_a - row_b) + abs(col_a - col_b)) * self.store.move_cost
+
+    def _set_goal(self, goal):
+        """Wall-free cost from every portal to ``goal`` (Dijkstra on portals)"""
+        store = self.store
+        plane, cols = store.plane, store.cols
+        self.goal = goal
+        self.goal_floor, rest = divmod(goal, plane)
+        self.goal_row, self.goal_col = divmod(rest, cols)
+
+        dist = {p: self._walk(p, goal) for p in self.floor_portals[self.goal_floor]}
+        queue = [(d, p) for p, d in dist.items()]
+        heapq.heapify(queue)
+        while queue:
+            d, portal = heapq.heappop(queue)
+            if d > dist[portal]:
+                continue
+            for other, cost in self.vertical[portal]:
+                if d + cost < dist.get(other, INF):
+                    dist[other] = d + cost
+                    heapq.heappush(queue, (d + cost, other))
+            for other in self.floor_portals[portal // plane]:
+                candidate = d + self._walk(portal, other)
+                if candidate < dist.get(other, INF):
+                    dist[other] = candidate
+                    heapq.heappush(queue, (candidate, other))
+
+        # Per floor: [(row, col, cost to goal)] and the cheapest of those costs
+        self.targets = []
+        self.floor_min = []
+        for portals in self.floor_portals:
+            targets = [divmod(p % plane, cols) + (dist[p],) for p in portals if p in dist]
+            self.targets.append(targets)
+            self.floor_min.append(min((t[2] for t in targets), default=INF))
+
+    def __call__(self, a, b):
+        if b != self.goal:
+            self._set_goal(b)
+        store = self.store
+        move_cost = store.move_cost
+        floor, rest = divmod(a, store.plane)
+        row, col = divmod(rest, store.cols)
+
+        bound = INF
+        if floor == self.goal_floor:
+            bound = (abs(row - self.goal_row) + abs(col - self.goal_col)) * move_cost
+        if bound > self.floor_min[floor]:
+            for portal_row, portal_col, cost in self.targets[floor]:
+                candidate = (abs(row - portal_row) + abs(col - portal_col)) * move_cost + cost
+                if candidate < bound:
+                    bound = candidate
+
+        if self.landmarks is not None:
+            landmark_bound = self.landmarks.lower_bound(a, b)
+            if landmark_bound > bound:
+                return landmark_bound
+        return bound
+
+
+def portal_bound(store):
+    """The store's shared PortalBound, refreshed for its current layout.
+
+    It includes the store's landmark table while that is still usable.
+    """
+    if store.portal_bound is None:
+        store.portal_bound = PortalBound(store)
+    else:
+        store.portal_bound.refresh()
+    table = store.landmarks
+    store.portal_bound.landmarks = table if table is not None and table.usable(store) else None
+    return store.portal_bound
@@ -0,0 +1,202 @@
+"""
+Hierarchical Multi-Floor Planner
+- Portals are the elevator and stairs cells, the only way between floors
+- Intra-floor distances between the portals of each floor are precomputed
+- A query is an A* search (portal-aware bound, as in engine.py) that goes
+  cell by cell on the start and end floors and portal to portal
+  everywhere else, so the end floors are explored towards the goal
+  rather than out to their farthest portal
+- Only the portal-to-portal legs the chosen route uses are refined to cells
+"""
+
+import heapq
+from collections import deque
+from grid_store import INF
+from heuristics import portal_bound
+
+
+def floor_moves(store, index):
+    """Yield the walkable 4-directional neighbors of a cell on its own floor"""
+    rows, cols, walkable = store.rows, store.cols, store.walkable
+    row, col = divmod(index % store.plane, cols)
+    if row < rows - 1 and walkable[index + cols]:
+        yield index + cols
+    if row > 0 and walkable[index - cols]:
+        yield index - cols
+    if col < cols - 1 and walkable[index + 1]:
+        yield index + 1
+    if col > 0 and walkable[index - 1]:
+        yield index - 1
+
+
+def floor_bfs(store, source, targets):
+    """Breadth-first search restricted to the source's floor.
+
+    Stops as soon as every target has been reached. Returns ``(dist, parent)``
+    dicts covering only the explored cells.
+    """
+    dist = {source: 0}
+    parent = {source: None}
+    remaining = set(targets)
+    remaining.discard(source)
+    queue = deque([source])
+
+    while queue and remaining:
+        current = queue.popleft()
+        d = dist[current] + store.move_cost
+        for neighbor in floor_moves(store, current):
+            if neighbor not in dist:
+                dist[neighbor] = d
+                parent[neighbor] = current
+                remaining.discard(neighbor)
+                queue.append(neighbor)
+
+    return dist, parent
+
+
+def floor_astar(store, source, target):
+    """Shortest in-floor path between two cells of the same floor, or None"""
+    cols = store.cols
+    target_row, target_col = divmod(target % store.plane, cols)
+
+    def h(index):
+        row, col = divmod(index % store.plane, cols)
+        return (abs(row - target_row) + abs(col - target_col)) * store.move_cost
+
+    g = {source: 0}
+    parent = {source: None}
+    open_set = [(h(source), source)]
+
+    while open_set:
+        f, current = heapq.heappop(open_set)
+        if current == target:
+            path = []
+            while current is not None:
+                path.append(current)
+                current = parent[current]
+            return path[::-1]
+        if f > g[current] + h(current):
+            continue
+        for neighbor in floor_moves(store, current):
+            temp_g = g[current] + store.move_cost
+            if temp_g < g.get(neighbor, INF):
+                g[neighbor] = temp_g
+                parent[neighbor] = current
+                heapq.heappush(open_set, (temp_g + h(neighbor), neighbor))
+
+    return None
+
+
+def _unwind(parent, index):
+    """Follow a parent chain from ``index`` back to the search source"""
+    chain = []
+    while index is not None:
+        chain.append(index)
+        index = parent[index]
+    return chain
+
+
+class HierarchicalPlanner:
+    """Two-level planner: portal graph across floors, cell grid within floors"""
+
+    def __init__(self, store):
+        self.store = store
+        self.floor_portals = [[] for _ in range(store.floors)]
+        self.intra = {}       # portal -> [(portal on same floor, cost)]
+        self.vertical = {}    # portal -> [(portal on other floor, cost)]
+        self.versions = [None] * store.floors
+        # Nodes expanded by the last search (cells, portals and refinement)
+        self.expanded = 0
+        self.refresh()
+
+    def refresh(self):
+        """Recompute portal distances for floors whose layout changed"""
+        store = self.store
+        dirty = [f for f in range(store.floors)
+                 if self.versions[f] != store.floor_versions[f]]
+        if not dirty:
+            return
+
+        portals = store.special_cells()
+        for f in dirty:
+            old = self.floor_portals[f]
+            for portal in old:
+                self.intra.pop(portal, None)
+            self.floor_portals[f] = [p for p in portals if p // store.plane == f]
+
+        for f in dirty:
+            floor_portals = self.floor_portals[f]
+            for portal in floor_portals:
+                dist, _ = floor_bfs(store, portal, floor_portals)
+                self.intra[portal] = [(other, dist[other]) for other in floor_portals
+                                      if other != portal and other in dist]
+            self.versions[f] = store.floor_versions[f]
+
+        # Vertical links are few; rebuild them whenever any floor changed
+        self.vertical = {}
+        for portal in portals:
+            floor = portal // store.plane
+            self.vertical[portal] = [(other, cost) for other, cost in store.neighbors(portal)
+                                     if other // store.plane != floor]
+
+    def search(self, start, end):
+        """Shortest route between two cells.
+
+        Returns ``(path, cost)`` with ``path`` a list of cell indices, or
+        ``(None, inf)`` when the end is unreachable.
+        """
+        self.refresh()
+        store = self.store
+        self.expanded = 0
+        if not store.walkable[start] or not store.walkable[end]:
+            return None, INF
+        cell_floors = {start // store.plane, end // store.plane}
+        h = portal_bound(store)
+
+        g = {start: 0}
+        parent = {start: None}
+        # Among equal f the cell nearer the goal comes first, as in engine.py
+        h_start = h(start, end)
+        open_set = [(h_start, h_start, 0, start)]
+        while open_set:
+            _, _, d, node = heapq.heappop(open_set)
+            if node == end:
+                return self._refine(_unwind(parent, end)[::-1]), d
+            if d > g[node]:
+                continue
+            self.expanded += 1
+            for neighbor, cost in self._edges(node, cell_floors):
+                temp = d + cost
+                if temp < g.get(neighbor, INF):
+                    h_neighbor = h(neighbor, end)
+                    if h_neighbor == INF:
+                        continue
+                    g[neighbor] = temp
+                    parent[neighbor] = node
+                    heapq.heappush(open_set, (temp + h_neighbor, h_neighbor, temp, neighbor))
+        return None, INF
+
+    def _edges(self, node, cell_floors):
+        """Moves on the two end floors, then portal links from a portal"""
+        store = self.store
+        if node // store.plane in cell_floors:
+            move_cost = store.move_cost
+            for neighbor in floor_moves(store, node):
+                yield neighbor, move_cost
+        if node in self.vertical:
+            yield from self.intra[node]
+            yield from self.vertical[node]
+
+    def _refine(self, route):
+        """Expand the portal-to-portal legs of a route into cells"""
+        store = self.store
+        plane = store.plane
+        path = route[:1]
+        for previous, node in zip(route, route[1:]):
+            if previous // plane == node // plane and node not in floor_moves(store, previous):
+                leg = floor_astar(store, previous, node)
+                self.expanded += len(leg)
+                path.extend(leg[1:])
+            else:
+                path.append(node)
+        return path
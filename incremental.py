@@ -0,0 +1,182 @@
+"""
+Incremental Replanning (D* Lite)
+- Searches backward from the goal and keeps g / rhs values between calls
+- Walkability changes are picked up from the store's listeners; the next
+  plan() repairs only the cells whose distance-to-goal actually changed
+- The start may move along the route (km key offset), as a robot does
+"""
+
+import heapq
+from grid_store import INF
+from heuristics import PortalBound
+
+
+class DStarLite:
+    """D* Lite planner for one goal on a GridStore"""
+
+    def __init__(self, store, start, goal, heuristic=None):
+        self.store = store
+        self.start = start
+        self.last = start
+        self.goal = goal
+        if heuristic is None:
+            # Keys need h(start, cell). The wall-free bound is symmetric, so
+            # ask it h(cell, start): its per-goal portal table then only
+            # changes when the robot moves
+            bound = PortalBound(store)
+            heuristic = lambda a, b: bound(b, a)
+        self.h = heuristic
+        self.km = 0
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.queue = []
+        self.queued = {}       # cell -> key currently valid in the heap
+        self.pending = set()   # cells whose walkability changed since last plan
+        self.expanded = 0
+        self._push(goal)
+        store.listeners.append(self._on_cell_changed)
+
+    def close(self):
+        """Stop listening to the store"""
+        if self._on_cell_changed in self.store.listeners:
+            self.store.listeners.remove(self._on_cell_changed)
+
+    # --- Public API ---
+
+    def plan(self):
+        """Repair the solution and return ``(path, cost)`` from the current start.
+
+        ``path`` is a list of cell indices, or None when the goal is unreachable.
+        """
+        if self.pending:
+            self.update_cells(self.pending)
+            self.pending = set()
+        self._compute_shortest_path()
+
+        cost = self._g(self.start)
+        if cost == INF:
+            return None, INF
+        return self._extract_path(), cost
+
+    def move_to(self, cell):
+        """The robot advanced to ``cell``; keep the existing search state"""
+        self.km += self.h(self.last, cell)
+        self.last = cell
+        self.start = cell
+
+    def update_cells(self, cells):
+        """Re-evaluate the given changed cells and everything bordering them"""
+        for cell in cells:
+            self._update_vertex(cell)
+            for neighbor in self._adjacent(cell):
+                self._update_vertex(neighbor)
+
+    # --- D* Lite internals ---
+
+    def _on_cell_changed(self, index, walkable):
+        self.pending.add(index)
+
+    def _g(self, cell):
+        return self.g.get(cell, INF)
+
+    def _rhs(self, cell):
+        return self.rhs.get(cell, INF)
+
+    def _key(self, cell):
+        """Priority (k1, underconsistent first, then farthest from the goal).
+
+        Ties on k1 go to underconsistent cells first, so a raised cell is
+        repaired before anything that leaned on it; among the rest the
+        cell nearest the start comes first, which keeps the search narrow
+        where many cells share k1 (open floors), as A* does in engine.py.
+        """
+        g, rhs = self._g(cell), self._rhs(cell)
+        best = min(g, rhs)
+        return best + self.h(self.start, cell) + self.km, g >= rhs, -best
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _top(self):
+        """Smallest valid queue entry, dropping stale ones"""
+        while self.queue:
+            key, cell = self.queue[0]
+            if self.queued.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.queue)
+        return (INF, True, -INF), None
+
+    def _adjacent(self, cell):
+        """In-floor neighbors regardless of walkability (barriers only sit on
+        plain floor cells, so no portal links are involved)"""
+        store = self.store
+        row, col = divmod(cell % store.plane, store.cols)
+        if row < store.rows - 1:
+            yield cell + store.cols
+        if row > 0:
+            yield cell - store.cols
+        if col < store.cols - 1:
+            yield cell + 1
+        if col > 0:
+            yield cell - 1
+
+    def _update_vertex(self, cell):
+        if cell != self.goal:
+            best = INF
+            if self.store.walkable[cell]:
+                for neighbor, cost in self.store.neighbors(cell):
+                    candidate = cost + self._g(neighbor)
+                    if candidate < best:
+                        best = candidate
+            self.rhs[cell] = best
+        self.queued.pop(cell, None)
+        if self._g(cell) != self._rhs(cell):
+            self._push(cell)
+
+    def _compute_shortest_path(self):
+        while True:
+            key, cell = self._top()
+            start_rhs = self._rhs(self.start)
+            if cell is None or (key >= self._key(self.start) and start_rhs == self._g(self.start)):
+                return
+
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)
+                continue
+
+            heapq.heappop(self.queue)
+            del self.queued[cell]
+            self.expanded += 1
+
+            if self._g(cell) > self._rhs(cell):
+                self.g[cell] = self.rhs[cell]
+                if self.store.walkable[cell]:
+                    for neighbor, _ in self.store.neighbors(cell):
+                        self._update_vertex(neighbor)
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                if self.store.walkable[cell]:
+                    for neighbor, _ in self.store.neighbors(cell):
+                        self._update_vertex(neighbor)
+
+    def _extract_path(self):
+        """Follow the cheapest successor from the start down to the goal"""
+        path = [self.start]
+        current = self.start
+        for _ in range(self.store.size):
+            if current == self.goal:
+                return path
+            best, best_cost = None, INF
+            for neighbor, cost in self.store.neighbors(current):
+                candidate = cost + self._g(neighbor)
+                if candidate < best_cost:
+                    best, best_cost = neighbor, candidate
+            if best is None:
+                return None
+            path.append(best)
+            current = best
+        return None
@@ -0,0 +1,232 @@
+"""
+Jump Point Search (4-connected)
+- On uniform-cost floors many shortest paths differ only in the order of
+  their moves; JPS follows one canonical order and only queues the cells
+  where a route may have to turn (jump points), skipping straight runs
+- Straight runs are read from per-floor jump tables: for every cell and
+  direction, the steps to the next jump point or to the wall in front.
+  Tables are rebuilt only for floors whose layout version changed
+- Elevator and stairs cells are always jump points, and a cell reached by
+  a floor change expands in every direction, so vertical moves stay exact
+- The goal is checked per query: a run stops in the goal's row (or column)
+  when the goal is in straight sight from there
+"""
+
+from grid_store import CellType, Mark, NO_PARENT, INF
+from heuristics import portal_bound
+from priority_queue import IndexedPriorityQueue
+
+# (row step, col step) in the order used by JumpTables.runs
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+EAST, WEST, SOUTH, NORTH = range(4)
+
+
+class JumpTables:
+    """Per-cell run lengths for the four directions of every floor.
+
+    ``runs[d][i] > 0``: the next jump point from cell i in direction d is
+    that many steps away. ``<= 0``: minus the number of open steps before a
+    wall (or the edge), with no jump point on the way.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.runs = [[0] * store.size for _ in DIRECTIONS]
+        self.versions = [None] * store.floors
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the tables of floors whose layout changed"""
+        store = self.store
+        for floor, version in enumerate(store.floor_versions):
+            if self.versions[floor] != version:
+                self._build_floor(floor)
+                self.versions[floor] = version
+
+    def _build_floor(self, floor):
+        store = self.store
+        rows, cols = store.rows, store.cols
+        base = floor * store.plane
+        east, west, south, north = self.runs
+
+        # Rows padded with a blocked cell at each end (and a blocked row above
+        # and below), so neighbor tests need no bounds checks; col c is at c + 1
+        blocked = bytes(cols + 2)
+        lines = [blocked]
+        portals = []
+        for row in range(rows):
+            first = base + row * cols
+            lines.append(b"\0" + bytes(store.walkable[first:first + cols]) + b"\0")
+            portals.append(store.cell_type[first:first + cols])
+        lines.append(blocked)
+
+        def step(run, open_ahead, stop):
+            if not open_ahead:
+                return 0
+            if stop:
+                return 1
+            return run + 1 if run > 0 else run - 1
+
+        # Horizontal runs stop where a cell above / below opens up behind them
+        for row in range(rows):
+            up, line, down = lines[row], lines[row + 1], lines[row + 2]
+            kinds = portals[row]
+            first = base + row * cols
+            run = west[first] = 0
+            for col in range(1, cols):
+                # The cell ahead is col - 1, at padded index col
+                run = west[first + col] = step(
+                    run, line[col], kinds[col - 1]
+                    or (up[col] and not up[col + 1]) or (down[col] and not down[col + 1]))
+            run = east[first + cols - 1] = 0
+            for col in range(cols - 2, -1, -1):
+                run = east[first + col] = step(
+                    run, line[col + 2], kinds[col + 1]
+                    or (up[col + 2] and not up[col + 1]) or (down[col + 2] and not down[col + 1]))
+
+        # Vertical runs also stop where a sideways run finds a jump point
+        for col in range(cols):
+            left, right = col, col + 2   # padded indices of the side columns
+            cell = base + col
+            run = north[cell] = 0
+            for row in range(1, rows):
+                ahead, cell = cell, cell + cols
+                behind, front = lines[row + 1], lines[row]
+                run = north[cell] = step(
+                    run, front[col + 1], portals[row - 1][col]
+                    or east[ahead] > 0 or west[ahead] > 0
+                    or (front[left] and not behind[left]) or (front[right] and not behind[right]))
+            run = south[cell] = 0
+            for row in range(rows - 2, -1, -1):
+                ahead, cell = cell, cell - cols
+                behind, front = lines[row + 1], lines[row + 2]
+                run = south[cell] = step(
+                    run, front[col + 1], portals[row + 1][col]
+                    or east[ahead] > 0 or west[ahead] > 0
+                    or (front[left] and not behind[left]) or (front[right] and not behind[right]))
+
+
+def jump_tables(store):
+    """The store's shared JumpTables, refreshed for its current layout"""
+    if store.jump_tables is None:
+        store.jump_tables = JumpTables(store)
+    else:
+        store.jump_tables.refresh()
+    return store.jump_tables
+
+
+def jump_point_search(store, start, end, observer=None, trace=None, heuristic=None):
+    """JPS on a GridStore; same arguments and result as engine.astar_search.
+
+    ``visited`` lists the jump points that were queued, and only jump points
+    are expanded; the returned path still lists every cell along the way.
+    """
+    store.new_search()
+    mark = store.mark if trace is None else trace.record
+    if heuristic is None:
+        heuristic = portal_bound(store)
+    runs = jump_tables(store).runs
+    g, parent, stamp, epoch = store.g, store.parent, store.stamp, store.epoch
+    cols, plane = store.cols, store.plane
+    move_cost = store.move_cost
+    cell_type = store.cell_type
+    goal_floor, rest = divmod(end, plane)
+    goal_row, goal_col = divmod(rest, cols)
+
+    def jump(cell, floor, row, col, direction):
+        """Steps to the next jump point from ``cell`` (0 when there is none)"""
+        run = runs[direction][cell]
+        stop = run if run > 0 else 0
+        reach = run if run > 0 else -run
+        if floor != goal_floor or not reach:
+            return stop
+        if direction <= WEST:
+            steps = (goal_col - col) * (1 if direction == EAST else -1)
+            if row == goal_row and 0 < steps <= reach:
+                return steps
+        else:
+            steps = (goal_row - row) * (1 if direction == SOUTH else -1)
+            if 0 < steps <= reach:
+                # Stop in the goal's row if the goal is in sight from there
+                turn = cell + steps * (cols if direction == SOUTH else -cols)
+                side = goal_col - col
+                if side == 0:
+                    return steps
+                sideways = runs[EAST if side > 0 else WEST][turn]
+                if (sideways if sideways > 0 else -sideways) >= abs(side):
+                    return steps
+        return stop
+
+    open_set = IndexedPriorityQueue()
+    h_start = heuristic(start, end)
+    open_set.push(start, (h_start, h_start))
+    store.touch(start)
+    g[start] = 0
+    visited = []
+
+    while open_set:
+        current = open_set.pop()
+
+        if current == end:
+            # Fill in the straight runs between consecutive jump points
+            path = [current]
+            while parent[current] != NO_PARENT:
+                before = parent[current]
+                if before // plane == current // plane:
+                    step = 1 if before // cols == current // cols else cols
+                    step = step if before > current else -step
+                    path.extend(range(current + step, before, step))
+                path.append(before)
+                current = before
+            path.reverse()
+            for index in path[1:-1]:
+                mark(index, Mark.PATH)
+            return path, visited
+
+        floor, rest = divmod(current, plane)
+        row, col = divmod(rest, cols)
+        g_current = g[current]
+        before = parent[current]
+
+        # Pruned directions: keep going, or turn; never head back
+        if before == NO_PARENT or before // plane != floor or cell_type[current] != CellType.FLOOR:
+            directions = (EAST, WEST, SOUTH, NORTH)
+        elif before // cols == current // cols:
+            directions = (EAST if current > before else WEST, SOUTH, NORTH)
+        else:
+            directions = (SOUTH if current > before else NORTH, EAST, WEST)
+
+        successors = []
+        for direction in directions:
+            steps = jump(current, floor, row, col, direction)
+            if steps:
+                d_row, d_col = DIRECTIONS[direction]
+                successors.append((current + steps * (d_row * cols + d_col), steps * move_cost))
+        if cell_type[current] != CellType.FLOOR:
+            successors += [(other, cost) for other, cost in store.neighbors(current)
+                           if other // plane != floor]
+
+        for neighbor, cost in successors:
+            temp_g = g_current + cost
+
+            if stamp[neighbor] != epoch:
+                store.touch(neighbor)
+
+            if temp_g < g[neighbor]:
+                h_neighbor = heuristic(neighbor, end)
+                if h_neighbor == INF:
+                    continue
+                parent[neighbor] = current
+                g[neighbor] = temp_g
+
+                if open_set.push(neighbor, (temp_g + h_neighbor, h_neighbor)):
+                    mark(neighbor, Mark.OPEN)
+                    visited.append(neighbor)
+
+        if observer:
+            observer(current)
+
+        if current != start:
+            mark(current, Mark.CLOSED)
+
+    return None, visited
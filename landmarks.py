@@ -0,0 +1,193 @@
+"""
+Landmark (ALT) Tables
+- Offline step: pick a few landmark cells and store the exact cost from
+  each of them to every cell (float32, one array per landmark)
+- The first landmark is a portal cell; each next one is the cell farthest
+  from those already picked, which spreads them to the building's extremes
+- Triangle inequality: cost(a, b) >= |d(L, a) - d(L, b)| for every landmark
+  L, so the tables give A* an admissible bound (see heuristics.PortalBound)
+- Tables are saved per building fingerprint and loaded at startup, so the
+  preprocessing is paid once per building version
+- Adding walls keeps a table valid (routes only get longer); freeing a cell
+  that was a wall when the table was built, or changing portals or costs,
+  makes it unusable until rebuilt
+"""
+
+import heapq
+import os
+import struct
+import sys
+from array import array
+from constants import *
+from grid_store import INF
+
+MAGIC = b"ALT1"
+VERSION = 1
+# magic, version, landmark count, floors, rows, cols, building fingerprint
+HEADER = struct.Struct("<4sHHIII64s")
+
+
+def distances_from(store, source):
+    """Exact cost from ``source`` to every cell (inf = unreachable)"""
+    dist = array('d', [INF]) * store.size
+    dist[source] = 0
+    queue = [(0, source)]
+    neighbors = store.neighbors
+    while queue:
+        d, current = heapq.heappop(queue)
+        if d > dist[current]:
+            continue
+        for neighbor, cost in neighbors(current):
+            candidate = d + cost
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                heapq.heappush(queue, (candidate, neighbor))
+    return dist
+
+
+class LandmarkTable:
+    """Cost from each landmark to every cell of one building"""
+
+    def __init__(self, landmarks, distances, fingerprint, shape):
+        self.landmarks = landmarks      # cell indices
+        self.distances = distances      # one array('f') per landmark
+        self.fingerprint = fingerprint
+        self.shape = shape              # (floors, rows, cols)
+        self.store = None
+        self.stale = False
+        self.goal = None
+
+    # --- Use with a store ---
+
+    def attach(self, store):
+        """Make this the store's table and watch it for freed cells"""
+        if self.store is not None:
+            self.detach()
+        self.store = store
+        self.costs = store.cost_config()
+        self.cell_type = bytes(store.cell_type)
+        self.stale = False
+        store.landmarks = self
+        store.listeners.append(self.on_cell_changed)
+        return self
+
+    def detach(self):
+        store = self.store
+        if self.on_cell_changed in store.listeners:
+            store.listeners.remove(self.on_cell_changed)
+        if store.landmarks is self:
+            store.landmarks = None
+        self.store = None
+
+    def on_cell_changed(self, index, walkable):
+        """Store listener: a cell walled off at build time is now open"""
+        if walkable and self.distances[0][index] == INF:
+            self.stale = True
+
+    def usable(self, store):
+        """True while every bound from this table is still admissible"""
+        return (store is self.store and not self.stale
+                and store.cost_config() == self.costs
+                and store.cell_type == self.cell_type)
+
+    def lower_bound(self, a, b):
+        """Largest triangle-inequality bound on the cost from ``a`` to ``b``"""
+        if b != self.goal:
+            self.goal = b
+            self.goal_distances = [dist[b] for dist in self.distances]
+        best = 0
+        for dist, to_goal in zip(self.distances, self.goal_distances):
+            from_a = dist[a]
+            if from_a == to_goal:
+                continue
+            if from_a == INF or to_goal == INF:
+                return INF   # a and b lie in different components
+            bound = from_a - to_goal if from_a > to_goal else to_goal - from_a
+            if bound > best:
+                best = bound
+        return best
+
+    # --- Persistence ---
+
+    def save(self, path):
+        """Write the table as a header, the landmark indices, then the arrays"""
+        floors, rows, cols = self.shape
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.landmarks), floors, rows, cols,
+                                self.fingerprint.encode()))
+            for block in [array('i', self.landmarks)] + self.distances:
+                if sys.byteorder == "big":
+                    block = array(block.typecode, block)
+                    block.byteswap()
+                block.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save(); raises ValueError if it is not one"""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f"{path}: truncated landmark table")
+            magic, version, count, floors, rows, cols, fingerprint = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a version {VERSION} landmark table")
+            size = floors * rows * cols
+            blocks = [array('i')] + [array('f') for _ in range(count)]
+            try:
+                blocks[0].fromfile(f, count)
+                for block in blocks[1:]:
+                    block.fromfile(f, size)
+            except EOFError:
+                raise ValueError(f"{path}: truncated landmark table") from None
+        if sys.byteorder == "big":
+            for block in blocks:
+                block.byteswap()
+        return cls(list(blocks[0]), blocks[1:], fingerprint.decode(), (floors, rows, cols))
+
+
+def build_landmarks(store, count=LANDMARK_COUNT):
+    """Pick up to ``count`` landmarks and compute their distance tables"""
+    portals = store.special_cells()
+    first = portals[0] if portals else store.walkable.find(1)
+    landmarks, distances = [], []
+    if first >= 0:
+        landmarks.append(first)
+        distances.append(distances_from(store, first))
+        nearest = array('d', distances[0])
+        while len(landmarks) < count:
+            # Farthest reachable cell from every landmark picked so far
+            farthest, far = None, 0
+            for index, d in enumerate(nearest):
+                if far < d < INF:
+                    farthest, far = index, d
+            if farthest is None:
+                break
+            landmarks.append(farthest)
+            distances.append(distances_from(store, farthest))
+            for index, d in enumerate(distances[-1]):
+                if d < nearest[index]:
+                    nearest[index] = d
+    return LandmarkTable(landmarks, [array('f', d) for d in distances],
+                         store.fingerprint(), (store.floors, store.rows, store.cols))
+
+
+def load_or_build(store, directory=LANDMARK_DIR, count=LANDMARK_COUNT):
+    """The table for this building version, from disk if it was saved before.
+
+    The table is attached to ``store`` so the engine's A* uses it.
+    """
+    fingerprint = store.fingerprint()
+    path = os.path.join(directory, f"{fingerprint}-{count}.alt")
+    table = None
+    if os.path.exists(path):
+        try:
+            table = LandmarkTable.load(path)
+        except (OSError, ValueError):
+            table = None
+        if table is not None and table.fingerprint != fingerprint:
+            table = None
+    if table is None:
+        table = build_landmarks(store, count)
+        os.makedirs(directory, exist_ok=True)
+        table.save(path)
+    return table.attach(store)
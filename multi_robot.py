@@ -0,0 +1,142 @@
+"""
+Multi-Robot Planning (prioritized, space-time reservations)
+- Robots are planned one after another; each plans a timed route around
+  the cells already reserved by the robots before it, so a conflict never
+  sends anyone else back to replanning
+- Time advances in steps of one move; a move that costs more (elevator,
+  stairs) keeps the robot on its departure cell until it arrives, so a
+  portal cell holds one robot at a time and busy portals make others wait
+- Reserved: every cell at every step of every route, the moves made in
+  each step (so two robots never swap cells head-on), and each goal from
+  its arrival on, since robots stay where they finish
+- Each robot searches over safe intervals (SIPP): a state is a cell and
+  one stretch of time in which nobody else is on it, so waiting costs no
+  extra states. Arrivals are guided by the exact cost-to-goal ignoring
+  other robots (one table per distinct goal)
+"""
+
+from bisect import insort
+from grid_store import INF
+from landmarks import distances_from
+from priority_queue import IndexedPriorityQueue
+
+
+class ReservationTable:
+    """Which cells are taken, and when"""
+
+    def __init__(self):
+        self.busy = {}        # cell -> sorted times at which it is taken
+        self.moves = set()    # (from cell, to cell, time) of every step that moves
+        self.parked = {}      # cell -> time from which a finished robot sits there
+        self.intervals = {}   # cell -> cached safe_intervals()
+
+    def safe_intervals(self, cell):
+        """Sorted (first, last) time spans in which ``cell`` is free"""
+        if cell not in self.intervals:
+            intervals = []
+            first = 0
+            for time in self.busy.get(cell, ()):
+                if time > first:
+                    intervals.append((first, time - 1))
+                first = time + 1
+            end = self.parked.get(cell, INF)
+            if end > first:
+                intervals.append((first, end - 1))
+            self.intervals[cell] = intervals
+        return self.intervals[cell]
+
+    def reserve(self, path):
+        """Claim a timed route: ``path[t]`` is the robot's cell at time t"""
+        for time, cell in enumerate(path):
+            insort(self.busy.setdefault(cell, []), time)
+            self.intervals.pop(cell, None)
+            if time and path[time - 1] != cell:
+                self.moves.add((path[time - 1], cell, time - 1))
+        self.parked[path[-1]] = len(path) - 1
+
+
+class PrioritizedPlanner:
+    """Collision-free timed routes for many robots on one GridStore"""
+
+    def __init__(self, store, max_delay=None):
+        self.store = store
+        self.max_delay = max_delay   # longest a robot may lose to waiting (None: no limit)
+        self.reservations = ReservationTable()
+        self.distances = {}          # goal -> cost from every cell
+        self.expanded = 0
+
+    def plan(self, tasks, order=None):
+        """Plan ``tasks`` = [(start, goal), ...] in priority ``order``.
+
+        The default order puts the longest routes first. Returns one timed
+        route per task, in task order (``route[t]`` is the cell at time t),
+        or None for a robot with no route (within ``max_delay``). Safe
+        intervals are finite, so even without a limit that search ends.
+        """
+        if order is None:
+            order = sorted(range(len(tasks)),
+                           key=lambda robot: -self.to_goal(tasks[robot][1])[tasks[robot][0]])
+        routes = [None] * len(tasks)
+        for robot in order:
+            route = self.plan_one(*tasks[robot])
+            if route is not None:
+                self.reservations.reserve(route)
+            routes[robot] = route
+        return routes
+
+    def to_goal(self, goal):
+        """Cost from every cell to ``goal``, ignoring other robots"""
+        if goal not in self.distances:
+            self.distances[goal] = distances_from(self.store, goal)
+        return self.distances[goal]
+
+    def plan_one(self, start, goal):
+        """Earliest arrival at ``goal`` (to stay) around the current reservations"""
+        reservations = self.reservations
+        to_goal = self.to_goal(goal)
+        first = reservations.safe_intervals(start)
+        if to_goal[start] == INF or not first or first[0][0] > 0:
+            return None
+        limit = INF if self.max_delay is None else to_goal[start] + self.max_delay
+        size = self.store.size
+        neighbors = self.store.neighbors
+        intervals = reservations.safe_intervals
+        moves = reservations.moves
+
+        # A state is interval number * size + cell; its cost is its arrival time
+        arrival = {start: 0}
+        came_from = {start: None}
+        open_set = IndexedPriorityQueue()
+        open_set.push(start, (to_goal[start], 0))
+
+        while open_set:
+            state = open_set.pop()
+            self.expanded += 1
+            number, cell = divmod(state, size)
+            time = arrival[state]
+            leave_by = intervals(cell)[number][1]   # last step this cell is ours
+            if cell == goal and leave_by == INF:
+                route = [cell]
+                while came_from[state] is not None:
+                    before, state = state, came_from[state]
+                    # Wait (or ride) on the earlier cell until the next arrival
+                    route.extend([state % size] * (arrival[before] - arrival[state]))
+                route.reverse()
+                return route
+
+            for target, duration in neighbors(cell):
+                remaining = to_goal[target]
+                for number, (opens, closes) in enumerate(intervals(target)):
+                    arrive = max(time + duration, opens)
+                    if arrive > leave_by + 1 or arrive + remaining > limit:
+                        break
+                    while (target, cell, arrive - 1) in moves and arrive <= closes:
+                        arrive += 1   # someone is coming the other way
+                    if arrive > closes or arrive > leave_by + 1:
+                        continue
+                    following = number * size + target
+                    if arrive < arrival.get(following, INF):
+                        arrival[following] = arrive
+                        came_from[following] = state
+                        open_set.push(following, (arrive + remaining, -arrive))
+        return None
@@ -0,0 +1,87 @@
+"""
+Parallel Query Execution
+- The building's walkability and portal layout (cell types) are copied
+  into shared memory once; the edge costs and portal links go to each
+  worker at start
+- Worker processes map that block read-only and keep their own private
+  search state (g / parent / stamps), so queries never contend
+- Queries are split along start cells, so each worker still shares one
+  Dijkstra tree per start (see batch.py)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from batch import RouteResult, group_by_source, route_many
+from grid_store import GridStore, INF
+
+# Per-worker state, set up once by the pool initializer
+_shared = None
+_store = None
+
+
+def _attach(name, floors, rows, cols, costs, links):
+    global _shared, _store
+    _shared = SharedMemory(name=name)
+    size = floors * rows * cols
+    buffer = _shared.buf
+    _store = GridStore(floors, rows, cols,
+                       walkable=buffer[:size].toreadonly(),
+                       cell_type=buffer[size:2 * size].toreadonly())
+    _store.move_cost, _store.elevator_cost, _store.stairs_cost = costs
+    _store.elevator_links, _store.stairs_links = links
+
+
+def _solve(queries):
+    return [tuple(result) for result in route_many(_store, queries)]
+
+
+class ParallelRouter:
+    """Answer routing queries on a pool of processes over a shared grid"""
+
+    def __init__(self, store, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        size = store.size
+        self.shared = SharedMemory(create=True, size=2 * size)
+        self.shared.buf[:size] = store.walkable
+        self.shared.buf[size:2 * size] = store.cell_type
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach,
+            initargs=(self.shared.name, store.floors, store.rows, store.cols,
+                      store.cost_config(), (store.elevator_links, store.stairs_links)))
+
+    def route_many(self, queries, chunk_size=None):
+        """Solve (start, end) queries in parallel.
+
+        Returns a list of RouteResult(path, cost) in query order, like
+        batch.route_many. Queries sharing a start stay in the same chunk.
+        """
+        if chunk_size is None:
+            chunk_size = max(1, len(queries) // (self.workers * 4))
+
+        chunks = [[]]
+        for members in group_by_source(queries).values():
+            if len(chunks[-1]) >= chunk_size:
+                chunks.append([])
+            chunks[-1].extend(members)
+
+        futures = [self.pool.submit(_solve, [queries[i] for i, _ in chunk])
+                   for chunk in chunks if chunk]
+
+        results = [RouteResult(None, INF)] * len(queries)
+        for chunk, future in zip((c for c in chunks if c), futures):
+            for (query_index, _), (path, cost) in zip(chunk, future.result()):
+                results[query_index] = RouteResult(path, cost)
+        return results
+
+    def close(self):
+        self.pool.shutdown()
+        self.shared.close()
+        self.shared.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,65 @@
+"""
+Indexed Priority Queue
+- Open set keyed on integer cell ids with true decrease-key: every id is
+  queued at most once, so there are no duplicate or stale entries
+- Items sit in one bucket per distinct key; only the keys go through a
+  heapq heap, which keeps the heap small and its work in C
+- Items with equal keys come out last-in first-out
+"""
+
+import heapq
+
+
+class IndexedPriorityQueue:
+    """Min-priority queue of int items; ``push`` inserts or lowers a key"""
+
+    __slots__ = ('keys', 'buckets', 'key_of')
+
+    def __init__(self):
+        self.keys = []       # heap of distinct keys (may hold emptied buckets)
+        self.buckets = {}    # key -> {item: None}, insertion ordered
+        self.key_of = {}     # item -> current key
+
+    def __len__(self):
+        return len(self.key_of)
+
+    def __contains__(self, item):
+        return item in self.key_of
+
+    def push(self, item, key):
+        """Queue ``item`` at ``key``, or lower its key if already queued.
+
+        Returns True when the item was not queued before. A key that is not
+        lower than the current one is ignored.
+        """
+        key_of = self.key_of
+        old = key_of.get(item)
+        if old is not None:
+            if not key < old:
+                return False
+            del self.buckets[old][item]
+        key_of[item] = key
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = bucket = {}
+            heapq.heappush(self.keys, key)
+        bucket[item] = None
+        return old is None
+
+    def min_key(self):
+        """The smallest queued key; the queue must not be empty"""
+        keys, buckets = self.keys, self.buckets
+        while not buckets[keys[0]]:
+            del buckets[heapq.heappop(keys)]
+        return keys[0]
+
+    def pop(self):
+        """Remove and return an item with the smallest key"""
+        keys, buckets = self.keys, self.buckets
+        while True:
+            bucket = buckets[keys[0]]
+            if bucket:
+                item = bucket.popitem()[0]
+                del self.key_of[item]
+                return item
+            del buckets[heapq.heappop(keys)]
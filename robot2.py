@@ -14,7 +14,13 @@ import pygame
 import sys
 from config import *
 from pathfinding import make_grid, astar_algorithm
-from ui_components import Button, Robot, draw_grid, draw_ui_panel
+from engine import mark_path
+from route_cache import RouteCache
+from landmarks import load_or_build
+from building_file import save_building, load_building
+from incremental import DStarLite
+from search_trace import SearchTrace, TraceReplayer
+from ui_components import Button, Robot, FrameRenderer
 
 
 def main():
@@ -32,9 +38,12 @@ def main():
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption("🤖 Robot Pathfinding Simulator")
     clock = pygame.time.Clock()
+    renderer = FrameRenderer(screen)
     
     # Create grid with elevator and stairs
     grid = make_grid(floors, tile_size, floor_width, rows, cols)
+    route_cache = RouteCache(grid[0][0][0].store)
+    load_or_build(grid[0][0][0].store)
     
     # State
     start = None
@@ -46,6 +55,9 @@ def main():
     
     robot = Robot()
     path_index = 0
+    replanner = None
+    replayer = None
+    found = None
     
     # --- BUTTONS (single row layout) ---
     panel_y = GRID_HEIGHT + scale(40)
@@ -63,6 +75,10 @@ def main():
                         BUTTON_WIDTH, BUTTON_HEIGHT, "Clear", "🗑️"),
         "RUN": Button(btn_x + (BUTTON_WIDTH + BUTTON_SPACING) * 5, panel_y, 
                       BUTTON_WIDTH, BUTTON_HEIGHT, "Run", "▶️", GREEN),
+        "SAVE": Button(btn_x + (BUTTON_WIDTH + BUTTON_SPACING) * 6, panel_y, 
+                       BUTTON_WIDTH, BUTTON_HEIGHT, "Save", "💾"),
+        "LOAD": Button(btn_x + (BUTTON_WIDTH + BUTTON_SPACING) * 7, panel_y, 
+                       BUTTON_WIDTH, BUTTON_HEIGHT, "Load", "📂"),
     }
     
     # Floor buttons (right side)
@@ -75,12 +91,21 @@ def main():
     grid_offset_x = scale(20)
     
     def update_grid():
-        nonlocal floor_width, tile_size, rows, cols, grid, start, end, path
+        nonlocal floor_width, tile_size, rows, cols
         floor_width, tile_size = calculate_dimensions(floors)
         rows = min(12, max(8, (GRID_HEIGHT - scale(50)) // tile_size))
         cols = min(12, max(8, (floor_width - scale(25)) // tile_size))
         tile_size = min((GRID_HEIGHT - scale(50)) // rows, (floor_width - scale(25)) // cols)
-        grid = make_grid(floors, tile_size, floor_width, rows, cols)
+        new_grid()
+
+    def new_grid(store=None):
+        """Build the node grid (over ``store`` if given) and reset the run"""
+        nonlocal grid, route_cache, start, end, path
+        drop_replanner()
+        stop_replay()
+        grid = make_grid(floors, tile_size, floor_width, rows, cols, store)
+        route_cache = RouteCache(grid[0][0][0].store)
+        load_or_build(grid[0][0][0].store)
         start = None
         end = None
         path = None
@@ -104,12 +129,6 @@ def main():
             return grid[floor][row][col]
         return None
 
-    def visualize():
-        screen.fill(BG_DARK)
-        draw_grid(screen, grid, floors, floor_width, tile_size)
-        draw_ui_panel(screen, buttons.values(), floors, current_tool, "Searching...", WINDOW_WIDTH, WINDOW_HEIGHT)
-        pygame.display.update()
-
     def handle_tool(name):
         nonlocal current_tool, status
         for t in ["WALL", "START", "END", "ERASER"]:
@@ -118,36 +137,104 @@ def main():
         status = f"{name} tool selected"
 
     def handle_clear():
-        nonlocal grid, start, end, path
-        grid = make_grid(floors, tile_size, floor_width, rows, cols)
-        start = None
-        end = None
-        path = None
-        robot.hide()
+        new_grid()
         return "Grid cleared"
 
+    def handle_save():
+        try:
+            save_building(grid[0][0][0].store, BUILDING_FILE)
+        except OSError as error:
+            return f"Save failed: {error}"
+        return f"Saved {BUILDING_FILE}"
+
+    def handle_load():
+        nonlocal floors, floor_width, tile_size, rows, cols
+        try:
+            store = load_building(BUILDING_FILE)
+        except (OSError, ValueError) as error:
+            return f"Load failed: {error}"
+        if not MIN_FLOORS <= store.floors <= MAX_FLOORS:
+            return f"Load failed: {store.floors} floors (shows {MIN_FLOORS}-{MAX_FLOORS})"
+        width, _ = calculate_dimensions(store.floors)
+        tile = min((GRID_HEIGHT - scale(50)) // store.rows, (width - scale(25)) // store.cols)
+        if tile < 2:
+            return f"Load failed: {store.rows}x{store.cols} floors are too large to show"
+        floors, rows, cols = store.floors, store.rows, store.cols
+        floor_width, tile_size = width, tile
+        new_grid(store)
+        return f"Loaded {BUILDING_FILE}"
+
+    def drop_replanner():
+        nonlocal replanner
+        if replanner:
+            replanner.close()
+            replanner = None
+
+    def stop_replay():
+        nonlocal replayer, is_running
+        replayer = None
+        is_running = False
+
+    def replan():
+        """Route around walls drawn onto the remaining path (D* Lite)"""
+        nonlocal path, path_index, replanner, status
+        here = path[path_index]
+        if here.is_barrier():
+            here = path[max(path_index - 1, 0)]
+        if replanner is None:
+            replanner = DStarLite(here.store, here.index, path[-1].index)
+        else:
+            replanner.move_to(here.index)
+        route, _ = replanner.plan()
+        mark_path(here.store, route)
+        if route:
+            path = [here.store.views[i] for i in route]
+            path_index = 0
+            robot.move_to(*here.get_center(grid_offset_x, 0))
+            status = f"Replanned! {len(path)} steps"
+        else:
+            path = None
+            status = "Route blocked!"
+
     def handle_run():
-        nonlocal is_running, path, path_index, status
+        nonlocal is_running, replayer, found, status
+        drop_replanner()
+        stop_replay()
         if start and end:
-            is_running = True
-            status = "Running A*..."
-            for f in range(floors):
-                for r in grid[f]:
-                    for n in r:
-                        n.update_neighbors(grid, floors, rows, cols)
-            result, _ = astar_algorithm(grid, start, end, floors, rows, cols, visualize)
-            if result:
-                path = result
-                path_index = 0
-                rx, ry = path[0].get_center(grid_offset_x, 0)
-                robot.set_position(rx, ry)
-                status = f"Path found! {len(path)} steps"
+            store = start.store
+            cached = route_cache.get(start.index, end.index)
+            if cached is not None:
+                mark_path(store, cached.path)
+                found = [store.views[i] for i in cached.path] if cached.path else None
+                finish_run(cached=True)
             else:
-                status = "No path found!"
-            is_running = False
+                # Search at full speed, then replay its trace frame by frame
+                trace = SearchTrace()
+                found, visited = astar_algorithm(grid, start, end, floors, rows, cols, trace=trace)
+                route_cache.put(start.index, end.index,
+                                [n.index for n in found] if found else None,
+                                end.g, [n.index for n in visited] + [start.index])
+                replayer = TraceReplayer(store, trace, REPLAY_FPS,
+                                         max_seconds=REPLAY_MAX_SECONDS)
+                is_running = True
+                status = "Searching..."
         else:
             status = "Set START and END first!"
 
+    def finish_run(cached=False):
+        nonlocal path, path_index, status
+        stop_replay()
+        if found:
+            path = found
+            path_index = 0
+            rx, ry = path[0].get_center(grid_offset_x, 0)
+            robot.set_position(rx, ry)
+            status = f"Path found! {len(path)} steps"
+            if cached:
+                status += " (cached)"
+        else:
+            status = "No path found!"
+
     def handle_floor_change(delta):
         nonlocal floors, status
         new_floors = floors + delta
@@ -206,6 +293,9 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+
+            if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                renderer.invalidate()
             
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
@@ -218,6 +308,10 @@ def main():
                                 status = handle_clear()
                             elif name == "RUN":
                                 handle_run()
+                            elif name == "SAVE":
+                                status = handle_save()
+                            elif name == "LOAD":
+                                status = handle_load()
                             elif name == "FLOOR_DOWN":
                                 handle_floor_change(-1)
                             elif name == "FLOOR_UP":
@@ -243,6 +337,14 @@ def main():
                 elif current_tool == "ERASER":
                     handle_erase(node)
         
+        # Search replay: paint the recorded open / closed / path marks
+        if replayer and not replayer.update():
+            finish_run()
+
+        # Walls drawn across the remaining route: repair it incrementally
+        if path and robot.visible and any(n.is_barrier() for n in path[path_index:]):
+            replan()
+
         # Robot animation
         if path and robot.visible:
             robot.update()
@@ -251,12 +353,9 @@ def main():
                 rx, ry = path[path_index].get_center(grid_offset_x, 0)
                 robot.move_to(rx, ry)
         
-        # Render
-        screen.fill(BG_DARK)
-        draw_grid(screen, grid, floors, floor_width, tile_size)
-        robot.draw(screen)
-        draw_ui_panel(screen, buttons.values(), floors, current_tool, status, WINDOW_WIDTH, WINDOW_HEIGHT)
-        pygame.display.flip()
+        # Render (only what changed since the last frame)
+        renderer.render(grid, floors, floor_width, tile_size, robot,
+                        buttons.values(), current_tool, status)
     
     pygame.quit()
     sys.exit()
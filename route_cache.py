@@ -0,0 +1,119 @@
+"""
+Route Cache
+- LRU cache of answered queries keyed on (start, end, cost config)
+- Subscribes to the store's walkability changes and drops entries precisely:
+  * a cell becomes a barrier -> entries whose path uses that cell
+  * a cell is freed -> entries whose explored region borders that cell
+    (a search can only have used the freed cell from a cell it expanded),
+    and every "no path" entry: a search with a landmark table stops at
+    once when the end lies in another component, so its explored region
+    says nothing about which walls kept them apart
+"""
+
+from collections import OrderedDict
+from batch import RouteResult
+from engine import astar_search
+from grid_store import INF
+
+
+class RouteCache:
+    """Least-recently-used cache of routes on one GridStore"""
+
+    def __init__(self, store, capacity=256):
+        self.store = store
+        self.capacity = capacity
+        self.entries = OrderedDict()   # key -> (RouteResult, explored)
+        self.by_path_cell = {}         # cell -> keys whose path uses it
+        self.by_explored_cell = {}     # cell -> keys whose search reached it
+        self.unreachable = set()       # keys cached with no path
+        self.hits = 0
+        self.misses = 0
+        store.listeners.append(self.on_cell_changed)
+
+    def key(self, start, end):
+        return start, end, self.store.cost_config()
+
+    def get(self, start, end):
+        """Cached RouteResult for the query, or None on a miss"""
+        key = self.key(start, end)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, start, end, path, cost, explored):
+        """Store a search result; ``explored`` is every cell the search reached"""
+        key = self.key(start, end)
+        if key in self.entries:
+            self._drop(key)
+        explored = frozenset(explored)
+        self.entries[key] = (RouteResult(path, cost), explored)
+        for cell in path or ():
+            self.by_path_cell.setdefault(cell, set()).add(key)
+        for cell in explored:
+            self.by_explored_cell.setdefault(cell, set()).add(key)
+        if path is None:
+            self.unreachable.add(key)
+        if len(self.entries) > self.capacity:
+            self._drop(next(iter(self.entries)))
+
+    def route(self, start, end):
+        """Answer a query from the cache, running A* on a miss"""
+        cached = self.get(start, end)
+        if cached is not None:
+            return cached
+        path, visited = astar_search(self.store, start, end)
+        cost = self.store.g_score(end) if path else INF
+        self.put(start, end, path, cost, visited + [start])
+        return RouteResult(path, cost)
+
+    def on_cell_changed(self, index, walkable):
+        """Store listener: invalidate entries affected by one cell edit"""
+        if walkable:
+            stale = set(self.unreachable)
+            for cell in self._border(index):
+                stale |= self.by_explored_cell.get(cell, set())
+        else:
+            stale = set(self.by_path_cell.get(index, ()))
+        for key in stale:
+            self._drop(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.by_path_cell.clear()
+        self.by_explored_cell.clear()
+        self.unreachable.clear()
+
+    def _border(self, index):
+        """The cell itself and its in-floor 4-neighbors"""
+        store = self.store
+        row, col = divmod(index % store.plane, store.cols)
+        cells = [index]
+        if row < store.rows - 1:
+            cells.append(index + store.cols)
+        if row > 0:
+            cells.append(index - store.cols)
+        if col < store.cols - 1:
+            cells.append(index + 1)
+        if col > 0:
+            cells.append(index - 1)
+        return cells
+
+    def _drop(self, key):
+        result, explored = self.entries.pop(key)
+        self.unreachable.discard(key)
+        for cell in result.path or ():
+            self._unindex(self.by_path_cell, cell, key)
+        for cell in explored:
+            self._unindex(self.by_explored_cell, cell, key)
+
+    @staticmethod
+    def _unindex(index, cell, key):
+        keys = index.get(cell)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[cell]
@@ -0,0 +1,199 @@
+"""
+Scenario Runner
+===============
+Replays recorded (building, start, end) queries headless and streams one
+JSON result per query, e.g. to check what a cost change does to a day of
+dispatch logs. Every stage is a generator, so memory stays flat however
+long the log is; only a few loaded buildings are kept at a time.
+
+Input: JSON lines or CSV (by extension, or --format). Each query names a
+building file (see building_file.py; --building sets a default) and its
+cells either as indices ("start", "end"; in JSON also [row, col, floor])
+or as start_row / start_col / start_floor and end_* columns. An "id"
+field is copied to the result.
+
+Usage:
+    python scenarios.py dispatch.jsonl -o results.jsonl
+    python scenarios.py dispatch.csv --building tower.bld --elevator-cost 6
+    zcat day.jsonl.gz | python scenarios.py - --format jsonl --mode jps
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import OrderedDict
+from building_file import load_building
+from engine import SEARCH_MODES
+from landmarks import load_or_build
+from grid_store import INF
+
+
+def read_queries(lines, fmt):
+    """Yield one dict per query line (None for a line that is not JSON)"""
+    if fmt == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+class BuildingCache:
+    """The most recently used buildings, loaded on demand"""
+
+    def __init__(self, capacity=4, costs=None, landmarks=False):
+        self.capacity = capacity
+        self.costs = costs or {}      # store attribute -> overriding cost
+        self.landmarks = landmarks
+        self.stores = OrderedDict()   # path -> GridStore
+
+    def get(self, path):
+        store = self.stores.get(path)
+        if store is not None:
+            self.stores.move_to_end(path)
+            return store
+        store = load_building(path)
+        for name, value in self.costs.items():
+            setattr(store, name, value)
+        if self.landmarks:
+            load_or_build(store)
+        self.stores[path] = store
+        if len(self.stores) > self.capacity:
+            self.stores.popitem(last=False)
+        return store
+
+
+def cell_index(store, query, name):
+    """The query's ``name`` cell ("start" / "end") as a store index"""
+    value = query.get(name)
+    if value in (None, ""):
+        value = [query.get(f"{name}_{part}") for part in ("row", "col", "floor")]
+    if isinstance(value, list):
+        row, col, floor = (int(part) for part in value)
+        if not (0 <= row < store.rows and 0 <= col < store.cols and 0 <= floor < store.floors):
+            raise ValueError(f"{name} {value} is outside the building")
+        return store.index(row, col, floor)
+    index = int(value)
+    if not 0 <= index < store.size:
+        raise ValueError(f"{name} {index} is outside the building")
+    return index
+
+
+def run_queries(queries, buildings, mode="astar", default_building=None):
+    """Yield one result dict per query, in input order"""
+    search = SEARCH_MODES[mode]
+    for number, query in enumerate(queries, 1):
+        result = {"query": number}
+        try:
+            if not isinstance(query, dict):
+                raise ValueError("not a query record")
+            if "id" in query:
+                result["id"] = query["id"]
+            path = query.get("building") or default_building
+            if not path:
+                raise ValueError("no building given")
+            result["building"] = path
+            store = buildings.get(path)
+            start, end = cell_index(store, query, "start"), cell_index(store, query, "end")
+        except (OSError, TypeError, ValueError) as error:
+            result["error"] = str(error)
+            yield result
+            continue
+
+        expanded = []
+        route = None
+        # Like batch.route_many, no route starts or ends inside a wall
+        if store.walkable[start] and store.walkable[end]:
+            route, _ = search(store, start, end, expanded.append)
+        cost = store.g_score(end) if route else INF
+        result.update(start=start, end=end,
+                      cost=None if cost == INF else cost,
+                      steps=len(route) if route else None,
+                      expanded=len(expanded))
+        yield result
+
+
+class Progress:
+    """Counts results as they pass and prints throughput every ``every`` seconds"""
+
+    def __init__(self, every=5.0, out=sys.stderr):
+        self.every = every
+        self.out = out
+        self.count = self.unreachable = self.errors = 0
+        self.started = self.last = time.perf_counter()
+
+    def watch(self, results):
+        for result in results:
+            self.count += 1
+            if "error" in result:
+                self.errors += 1
+            elif result["cost"] is None:
+                self.unreachable += 1
+            yield result
+            now = time.perf_counter()
+            if self.every and now - self.last >= self.every:
+                self.last = now
+                self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.count / elapsed if elapsed else 0
+        print(f"{self.count:,} queries  {rate:,.0f} q/s  "
+              f"unreachable {self.unreachable:,}  errors {self.errors:,}  ({elapsed:.1f}s)",
+              file=self.out, flush=True)
+
+
+def cost(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded routing queries headless")
+    parser.add_argument("queries", help="JSON lines or CSV file of queries ('-' for stdin)")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="input format (default: from the file extension)")
+    parser.add_argument("--building", help="building file for queries that name none")
+    parser.add_argument("--mode", choices=sorted(SEARCH_MODES), default="astar")
+    parser.add_argument("--move-cost", type=cost)
+    parser.add_argument("--elevator-cost", type=cost)
+    parser.add_argument("--stairs-cost", type=cost)
+    parser.add_argument("--landmarks", action="store_true",
+                        help="load or build landmark tables for each building")
+    parser.add_argument("--buildings", type=int, default=4,
+                        help="loaded buildings kept in memory (default 4)")
+    parser.add_argument("--progress", type=float, default=5.0,
+                        help="seconds between progress lines, 0 for none (default 5)")
+    parser.add_argument("-o", "--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.queries.endswith(".csv") else "jsonl")
+    costs = {name: value for name, value in (("move_cost", args.move_cost),
+                                             ("elevator_cost", args.elevator_cost),
+                                             ("stairs_cost", args.stairs_cost))
+             if value is not None}
+    buildings = BuildingCache(args.buildings, costs, args.landmarks)
+    progress = Progress(args.progress)
+
+    source = sys.stdin if args.queries == "-" else open(args.queries, newline="")
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        results = run_queries(read_queries(source, fmt), buildings, args.mode, args.building)
+        for result in progress.watch(results):
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    progress.report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
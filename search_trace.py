@@ -0,0 +1,70 @@
+"""
+Search Trace Recording and Replay
+- A search given a SearchTrace runs at full speed and records its
+  open / closed / path events instead of painting them
+- TraceReplayer paints those events back onto the store at a fixed frame
+  rate, many events per frame, so drawing cost follows the frame rate
+  rather than the number of expanded nodes
+"""
+
+import math
+import time
+from array import array
+
+
+class SearchTrace:
+    """Compact, ordered record of (cell, mark) events from one search"""
+
+    def __init__(self):
+        self.indices = array('i')
+        self.marks = bytearray()
+
+    def record(self, index, mark):
+        """Same signature as GridStore.mark, so a search can use either"""
+        self.indices.append(index)
+        self.marks.append(mark)
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class TraceReplayer:
+    """Replays a SearchTrace onto a store over time.
+
+    ``fps`` is the replay frame rate; each frame applies ``events_per_frame``
+    events. When that is not given it is chosen so the whole replay takes
+    at most ``max_seconds``.
+    """
+
+    def __init__(self, store, trace, fps=30, events_per_frame=None, max_seconds=3.0):
+        self.store = store
+        self.trace = trace
+        self.fps = fps
+        if events_per_frame is None:
+            events_per_frame = math.ceil(len(trace) / (fps * max_seconds))
+        self.events_per_frame = max(1, events_per_frame)
+        self.position = 0
+        self.started = None
+
+    @property
+    def done(self):
+        return self.position >= len(self.trace)
+
+    def update(self, now=None):
+        """Apply every frame that is due; returns True while events remain"""
+        now = time.perf_counter() if now is None else now
+        if self.started is None:
+            self.started = now
+        frames_due = int((now - self.started) * self.fps) + 1
+        self._apply_until(min(len(self.trace), frames_due * self.events_per_frame))
+        return not self.done
+
+    def finish(self):
+        """Skip to the end of the replay"""
+        self._apply_until(len(self.trace))
+
+    def _apply_until(self, target):
+        store, indices, marks = self.store, self.trace.indices, self.trace.marks
+        for position in range(self.position, target):
+            store.mark(indices[position], marks[position])
+        self.position = max(self.position, target)
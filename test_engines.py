@@ -0,0 +1,200 @@
+"""
+Search Engine Tests
+- Every benchmark engine must return the exact cheapest cost, checked
+  against a plain Dijkstra on seeded random buildings
+- Building files round-trip and reject corrupt input
+- Route cache, landmark, D* Lite and multi-robot invariants
+
+Run with: python -m pytest -q
+"""
+
+import heapq
+import re
+import pytest
+import benchmark
+from building_file import HEADERS, load_building, save_building
+from grid_store import INF, Paint
+from incremental import DStarLite
+from landmarks import build_landmarks
+from multi_robot import PrioritizedPlanner
+from route_cache import RouteCache
+from topology import build_store
+
+# (floors, rows, cols, density, layout, seed)
+BUILDINGS = [
+    (2, 12, 12, 0.0, "full", 1),
+    (3, 15, 15, 0.2, "full", 2),
+    (4, 10, 14, 0.3, "elevator", 3),
+    (3, 12, 9, 0.25, "stairs", 4),
+]
+
+
+def dijkstra(store, source):
+    """Reference cost from ``source`` to every reachable cell"""
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        d, cell = heapq.heappop(heap)
+        if d > dist[cell]:
+            continue
+        for neighbor, cost in store.neighbors(cell):
+            if d + cost < dist.get(neighbor, INF):
+                dist[neighbor] = d + cost
+                heapq.heappush(heap, (d + cost, neighbor))
+    return dist
+
+
+def expected_costs(store, queries):
+    return [dijkstra(store, start).get(end, INF) for start, end in queries]
+
+
+def engine_costs(engine, store, queries):
+    run = benchmark.ENGINES[engine]
+    if engine in benchmark.PREPARE:
+        prepared = benchmark.PREPARE[engine](store)
+        if prepared is not None:
+            return run(store, queries, prepared)[1]
+    return run(store, queries)[1]
+
+
+@pytest.mark.parametrize("engine", sorted(benchmark.ENGINES))
+@pytest.mark.parametrize("building", BUILDINGS)
+def test_engine_matches_dijkstra(engine, building):
+    store = benchmark.generate_building(*building)
+    queries = benchmark.generate_queries(store, 12, building[-1])
+    assert engine_costs(engine, store, queries) == pytest.approx(expected_costs(store, queries))
+
+
+def test_generate_queries_needs_a_free_cell():
+    store = benchmark.generate_building(2, 5, 5, 1.0, "full", 1)
+    with pytest.raises(ValueError):
+        benchmark.generate_queries(store, 3, 1)
+
+
+# --- Building files ---
+
+def test_building_round_trip(tmp_path):
+    store = build_store({
+        "floors": 3, "rows": 6, "cols": 7,
+        "elevators": [{"row": 2, "col": 3}, {"row": 0, "col": 0, "floors": [0, 2]}],
+        "stairs": [{"row": 5, "col": 6, "to_col": 0}],
+    })
+    store.move_cost, store.stairs_cost = 2, 7.5
+    for index in (10, 11, 50, 100):
+        store.set_paint(index, Paint.BARRIER)
+    path = tmp_path / "building.bld"
+    save_building(store, path)
+    loaded = load_building(path)
+    assert loaded.fingerprint() == store.fingerprint()
+    assert loaded.paint == store.paint
+
+
+@pytest.mark.parametrize("corrupt", ["truncated", "magic", "huge", "portal", "self link",
+                                     "same floor link"])
+def test_corrupt_building_file(tmp_path, corrupt):
+    store = build_store({"floors": 2, "rows": 4, "cols": 4,
+                         "elevators": [{"row": 1, "col": 1}, {"row": 2, "col": 2}]})
+    path = tmp_path / "building.bld"
+    save_building(store, path)
+    data = bytearray(path.read_bytes())
+    header = HEADERS[2]
+    if corrupt == "truncated":
+        del data[-1]
+    elif corrupt == "magic":
+        data[:4] = b"XXXX"
+    elif corrupt == "huge":
+        fields = list(header.unpack_from(data))
+        fields[2:5] = 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF
+        header.pack_into(data, 0, *fields)
+    elif corrupt == "portal":
+        data[header.size:header.size + 4] = (10 ** 6).to_bytes(4, "little")
+    else:
+        # Portals are cells 5, 10 (floor 0) and 21, 26 (floor 1); the first
+        # link joins 5 and 21. Point it back at 5, or at the other car's 10
+        links = header.size + 4 * 5
+        target = links if corrupt == "self link" else header.size + 4
+        data[links + 4:links + 8] = data[target:target + 4]
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match=re.escape(str(path))):
+        load_building(path)
+
+
+# --- Invariants of the stateful planners ---
+
+def test_route_cache_invalidation():
+    store = benchmark.generate_building(1, 8, 8, 0.0, "full", 1)
+    cache = RouteCache(store)
+    start, end = store.index(0, 0, 0), store.index(0, 7, 0)
+    first = cache.route(start, end)
+    assert first.cost == 7
+    # Walling a cell on the cached path must drop the entry
+    store.set_paint(first.path[3], Paint.BARRIER)
+    detour = cache.route(start, end)
+    assert first.path[3] not in detour.path
+    assert detour.cost == dijkstra(store, start)[end]
+    # Freeing it again must bring the short route back
+    store.set_paint(first.path[3], Paint.EMPTY)
+    assert cache.route(start, end).cost == 7
+
+
+def test_route_cache_drops_no_path_when_a_cell_is_freed():
+    store = benchmark.generate_building(1, 5, 5, 0.0, "full", 1)
+    wall = [store.index(row, 2, 0) for row in range(5)]
+    for index in wall:
+        store.set_paint(index, Paint.BARRIER)
+    build_landmarks(store).attach(store)
+    cache = RouteCache(store)
+    start, end = store.index(0, 0, 0), store.index(0, 4, 0)
+    assert cache.route(start, end).path is None
+    store.set_paint(wall[4], Paint.EMPTY)
+    assert cache.route(start, end).path is not None
+
+
+def test_landmarks_go_stale_when_a_wall_opens():
+    store = benchmark.generate_building(2, 10, 10, 0.3, "full", 5)
+    table = build_landmarks(store, 4).attach(store)
+    assert table.usable(store)
+    wall = next(index for index in range(store.size) if not store.walkable[index])
+    store.set_paint(wall, Paint.EMPTY)
+    assert table.stale and not table.usable(store)
+
+
+def test_dstar_lite_replans_to_the_new_optimum():
+    store = benchmark.generate_building(2, 12, 12, 0.15, "full", 6)
+    start, goal = benchmark.generate_queries(store, 1, 6)[0]
+    planner = DStarLite(store, start, goal)
+    path, cost = planner.plan()
+    assert cost == dijkstra(store, start).get(goal, INF)
+    for step in range(3):
+        planner.move_to(path[1])
+        blocked = [cell for cell in path[2:-1] if not store.is_special(cell)][:1]
+        for cell in blocked:
+            store.set_paint(cell, Paint.BARRIER)
+        path, cost = planner.plan()
+        assert cost == dijkstra(store, planner.start).get(goal, INF)
+        if path is None:
+            break
+        assert not set(blocked) & set(path)
+    planner.close()
+
+
+def test_multi_robot_routes_never_collide():
+    store = benchmark.generate_building(2, 8, 8, 0.1, "full", 7)
+    queries = benchmark.generate_queries(store, 6, 7)
+    starts = {start for start, _ in queries}
+    goals = {goal for _, goal in queries}
+    tasks = [(start, goal) for start, goal in queries]
+    if len(starts) < len(tasks) or len(goals) < len(tasks):
+        pytest.skip("seeded tasks share a cell")
+    routes = [route for route in PrioritizedPlanner(store).plan(tasks) if route]
+    assert routes
+    horizon = max(len(route) for route in routes)
+    # Robots stay on their goal once they arrive
+    timelines = [route + [route[-1]] * (horizon - len(route)) for route in routes]
+    for time in range(horizon):
+        cells = [timeline[time] for timeline in timelines]
+        assert len(set(cells)) == len(cells), f"two robots share a cell at t={time}"
+        if time:
+            moves = {(timeline[time - 1], timeline[time]) for timeline in timelines
+                     if timeline[time - 1] != timeline[time]}
+            assert not any((to, frm) in moves for frm, to in moves), f"swap at t={time}"
@@ -0,0 +1,84 @@
+"""
+Building Topology
+- A plain (JSON-friendly) description of a building's shape and portals,
+  turned into a GridStore with an explicit portal adjacency index:
+
+    {"floors": 10, "rows": 40, "cols": 60,
+     "floor_sizes": [[40, 60], ..., [20, 30]],       # optional, per floor
+     "elevators": [{"row": 20, "col": 30},           # serves every floor
+                   {"row": 5, "col": 5, "floors": [0, 5, 9]}],   # express
+     "stairs": [{"row": 10, "col": 12},              # straight shaft
+                {"row": 1, "col": 59, "to_row": 1, "to_col": 0,
+                 "floors": [0, 1, 2]}]}
+
+- An elevator is one car: it links its stops on every floor it serves
+- A stairs entry is a flight from (row, col) on floor f to (to_row, to_col)
+  on floor f + 1, for each f in "floors" (default: every floor but the top)
+- A floor smaller than rows x cols keeps its top-left corner; the cells
+  outside it are walled off
+"""
+
+from grid_store import GridStore, CellType, Paint, STAIRS_TYPES
+
+
+def default_topology(floors, rows, cols, elevator=True, stairs=True):
+    """The built-in layout: one elevator at the center, and stairs in rows
+    1 and rows - 2 from each floor's right edge to the next floor's left edge
+
+    On tiny floors where these overlap, stairs win: the bottom flight over
+    the top one (3 rows), and both over the elevator (2 columns).
+    """
+    description = {"floors": floors, "rows": rows, "cols": cols,
+                   "elevators": [], "stairs": []}
+    stairs_rows = {}
+    if stairs:
+        stairs_rows = {row: position for row, position in {1: "top", rows - 2: "bottom"}.items()
+                       if 0 <= row < rows}
+    for row, position in stairs_rows.items():
+        description["stairs"].append({"row": row, "col": cols - 1, "to_row": row,
+                                      "to_col": 0, "position": position})
+    row, col = rows // 2, cols // 2
+    if elevator and not (row in stairs_rows and col in (0, cols - 1)):
+        description["elevators"].append({"row": row, "col": col})
+    return description
+
+
+def build_store(description):
+    """GridStore for a topology description; raises ValueError if it does not fit"""
+    floors, rows, cols = description["floors"], description["rows"], description["cols"]
+    store = GridStore(floors, rows, cols)
+    sizes = description.get("floor_sizes") or [(rows, cols)] * floors
+    if len(sizes) != floors:
+        raise ValueError(f"floor_sizes lists {len(sizes)} floors, not {floors}")
+
+    def cell(row, col, floor, kind):
+        if not (0 <= floor < floors and 0 <= row < sizes[floor][0] and 0 <= col < sizes[floor][1]):
+            raise ValueError(f"portal ({row}, {col}) is outside floor {floor}")
+        index = store.index(row, col, floor)
+        if store.cell_type[index] not in (CellType.FLOOR, kind):
+            raise ValueError(f"two kinds of portal at ({row}, {col}) on floor {floor}")
+        return index
+
+    # Wall off the cells outside smaller floors
+    for floor, (floor_rows, floor_cols) in enumerate(sizes):
+        if not (0 < floor_rows <= rows and 0 < floor_cols <= cols):
+            raise ValueError(f"floor {floor} size {floor_rows}x{floor_cols} does not fit")
+        for row in range(rows):
+            first = store.index(row, 0, floor)
+            start = first + (floor_cols if row < floor_rows else 0)
+            store.walkable[start:first + cols] = bytes(first + cols - start)
+            store.paint[start:first + cols] = bytes([Paint.BARRIER]) * (first + cols - start)
+
+    for elevator in description.get("elevators", ()):
+        served = elevator.get("floors", range(floors))
+        store.link_elevator([cell(elevator["row"], elevator["col"], floor, CellType.ELEVATOR)
+                             for floor in served])
+
+    for flight in description.get("stairs", ()):
+        row, col = flight["row"], flight["col"]
+        to_row, to_col = flight.get("to_row", row), flight.get("to_col", col)
+        kind = STAIRS_TYPES.get(flight.get("position"), CellType.STAIRS)
+        for floor in flight.get("floors", range(floors - 1)):
+            store.link_stairs(cell(row, col, floor, kind), cell(to_row, to_col, floor + 1, kind),
+                              kind)
+    return store
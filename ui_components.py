@@ -5,9 +5,51 @@ Contains Button class, Robot class, and drawing functions
 
 import pygame
 import math
+from collections import OrderedDict
 from config import *
 
 
+class FontRegistry:
+    """One SysFont lookup per (size, bold) for the whole session"""
+
+    def __init__(self, name='Segoe UI'):
+        self.name = name
+        self.fonts = {}
+
+    def get(self, size, bold=False):
+        key = (size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(self.name, size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces keyed by (text, color, size, bold)"""
+
+    def __init__(self, fonts, capacity=128):
+        self.fonts = fonts
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def render(self, text, color, size, bold=False):
+        key = (text, color, size, bold)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.fonts.get(size, bold).render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
+
+
 class Button:
     """Interactive button with hover and active states"""
     
@@ -18,7 +60,7 @@ class Button:
         self.base_color = color
         self.is_hovered = False
         self.is_active = False
-        self.font = pygame.font.SysFont('Segoe UI', FONT_SIZE_MEDIUM, bold=True)
+        self.font = fonts.get(FONT_SIZE_MEDIUM, bold=True)
         self.border_radius = scale(8)
 
     def draw(self, surface):
@@ -37,15 +79,15 @@ class Button:
 
         # Draw icon + text
         if self.icon:
-            icon_surf = self.font.render(self.icon, True, TEXT_PRIMARY)
-            text_surf = self.font.render(self.text, True, TEXT_PRIMARY)
+            icon_surf = text_cache.render(self.icon, TEXT_PRIMARY, FONT_SIZE_MEDIUM, bold=True)
+            text_surf = text_cache.render(self.text, TEXT_PRIMARY, FONT_SIZE_MEDIUM, bold=True)
             total_width = icon_surf.get_width() + scale(6) + text_surf.get_width()
             icon_x = self.rect.centerx - total_width // 2
             surface.blit(icon_surf, (icon_x, self.rect.centery - icon_surf.get_height() // 2))
             surface.blit(text_surf, (icon_x + icon_surf.get_width() + scale(6), 
                                       self.rect.centery - text_surf.get_height() // 2))
         else:
-            text_surf = self.font.render(self.text, True, TEXT_PRIMARY)
+            text_surf = text_cache.render(self.text, TEXT_PRIMARY, FONT_SIZE_MEDIUM, bold=True)
             surface.blit(text_surf, (self.rect.centerx - text_surf.get_width() // 2, 
                                       self.rect.centery - text_surf.get_height() // 2))
 
@@ -131,6 +173,16 @@ class Robot:
         pygame.draw.rect(surface, (80, 80, 100), (x - body_w//2 - scale(2), y + body_h//2 - scale(6), scale(5), scale(7)), border_radius=2)
         pygame.draw.rect(surface, (80, 80, 100), (x + body_w//2 - scale(3), y + body_h//2 - scale(6), scale(5), scale(7)), border_radius=2)
 
+    def get_rect(self):
+        """Screen area covered by the robot and its trail"""
+        half_w = scale(12) + scale(4)
+        x, y = int(self.x), int(self.y + self.animation_offset)
+        rect = pygame.Rect(x - half_w, y - scale(14) - scale(16), half_w * 2, scale(14) * 2 + scale(20))
+        trail_size = scale(7)
+        for tx, ty in self.trail:
+            rect.union_ip(pygame.Rect(tx - trail_size, ty - trail_size, trail_size * 2, trail_size * 2))
+        return rect.inflate(6, 6)
+
     def is_at_target(self):
         return abs(self.x - self.target_x) < 2 and abs(self.y - self.target_y) < 2
 
@@ -139,34 +191,95 @@ class Robot:
         self.trail = []
 
 
+class TileAtlas:
+    """Pre-rendered node tiles keyed by (cell type, color, tile_size).
+
+    Each combination is drawn once with Node.draw onto a transparent
+    surface; the cache is dropped when the tile size changes (new floor
+    count / window layout from calculate_dimensions).
+    """
+
+    def __init__(self):
+        self.tile_size = None
+        self.tiles = {}
+
+    def get(self, node):
+        tile_size = node.tile_size
+        if tile_size != self.tile_size:
+            self.tiles.clear()
+            self.tile_size = tile_size
+        key = (node.store.cell_type[node.index], node.color, tile_size)
+        tile = self.tiles.get(key)
+        if tile is None:
+            tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+            node.draw(tile, -node.x, -node.y - scale(45))
+            self.tiles[key] = tile
+        return tile
+
+
+tile_atlas = TileAtlas()
+
+
+def draw_floor_background(win, f, floor_width, grid_offset_y=0):
+    offset_x = scale(20)
+    floor_rect = pygame.Rect(f * floor_width + offset_x, scale(38) + grid_offset_y, 
+                             floor_width - scale(6), GRID_HEIGHT - scale(5))
+    pygame.draw.rect(win, GRID_BG, floor_rect, border_radius=scale(6))
+    pygame.draw.rect(win, (50, 55, 70), floor_rect, 1, border_radius=scale(6))
+
+
+def draw_floor_label(win, f, floor_width, grid_offset_y=0):
+    """Draw the "Floor N" badge and return its rect"""
+    offset_x = scale(20)
+    label = f"Floor {f + 1}"
+    label_surf = text_cache.render(label, TEXT_PRIMARY, FONT_SIZE_LARGE, bold=True)
+    label_x = f * floor_width + offset_x + (floor_width - label_surf.get_width()) // 2 - scale(3)
+    label_bg = pygame.Rect(label_x - scale(6), scale(44) + grid_offset_y, 
+                           label_surf.get_width() + scale(12), label_surf.get_height() + scale(6))
+    pygame.draw.rect(win, PANEL_BG, label_bg, border_radius=scale(4))
+    pygame.draw.rect(win, ACCENT, label_bg, 1, border_radius=scale(4))
+    win.blit(label_surf, (label_x, scale(47) + grid_offset_y))
+    return label_bg
+
+
 def draw_grid(win, grid, floors, floor_width, tile_size, grid_offset_y=0):
     """Render the grid with all floors"""
     offset_x = scale(20)
     
     # Floor backgrounds
     for f in range(floors):
-        floor_rect = pygame.Rect(f * floor_width + offset_x, scale(38) + grid_offset_y, 
-                                 floor_width - scale(6), GRID_HEIGHT - scale(5))
-        pygame.draw.rect(win, GRID_BG, floor_rect, border_radius=scale(6))
-        pygame.draw.rect(win, (50, 55, 70), floor_rect, 1, border_radius=scale(6))
+        draw_floor_background(win, f, floor_width, grid_offset_y)
     
-    # Nodes
-    for f in range(floors):
-        for row in grid[f]:
-            for node in row:
-                node.draw(win, offset_x, grid_offset_y)
+    # Nodes: cached tiles pushed in one batched blit
+    tile_y = scale(45) + grid_offset_y
+    win.blits([(tile_atlas.get(node), (node.x + offset_x, node.y + tile_y))
+               for f in range(floors) for row in grid[f] for node in row], False)
     
     # Floor labels
-    font = pygame.font.SysFont('Segoe UI', FONT_SIZE_LARGE, bold=True)
     for f in range(floors):
-        label = f"Floor {f + 1}"
-        label_surf = font.render(label, True, TEXT_PRIMARY)
-        label_x = f * floor_width + offset_x + (floor_width - label_surf.get_width()) // 2 - scale(3)
-        label_bg = pygame.Rect(label_x - scale(6), scale(44) + grid_offset_y, 
-                               label_surf.get_width() + scale(12), label_surf.get_height() + scale(6))
-        pygame.draw.rect(win, PANEL_BG, label_bg, border_radius=scale(4))
-        pygame.draw.rect(win, ACCENT, label_bg, 1, border_radius=scale(4))
-        win.blit(label_surf, (label_x, scale(47) + grid_offset_y))
+        draw_floor_label(win, f, floor_width, grid_offset_y)
+
+
+def draw_cells(win, nodes, floor_width, tile_size, grid_offset_y=0):
+    """Redraw single nodes in place, layering exactly as draw_grid does.
+
+    Each node's tile is clipped and rebuilt from its floor background, the
+    node itself and (for the top row) the floor label. Returns the rects.
+    """
+    offset_x = scale(20)
+    label_top = scale(44) + grid_offset_y
+    rects = []
+    for node in nodes:
+        rect = pygame.Rect(node.x + offset_x, node.y + grid_offset_y + scale(45),
+                           tile_size, tile_size)
+        win.set_clip(rect)
+        draw_floor_background(win, node.floor, floor_width, grid_offset_y)
+        win.blit(tile_atlas.get(node), rect)
+        if rect.top < label_top + FONT_SIZE_LARGE * 2:
+            draw_floor_label(win, node.floor, floor_width, grid_offset_y)
+        rects.append(rect)
+    win.set_clip(None)
+    return rects
 
 
 def draw_ui_panel(win, buttons, floors, current_tool, status, width, height):
@@ -183,43 +296,116 @@ def draw_ui_panel(win, buttons, floors, current_tool, status, width, height):
         button.draw(win)
     
     # Right side info
-    font = pygame.font.SysFont('Segoe UI', FONT_SIZE_MEDIUM, bold=True)
-    small_font = pygame.font.SysFont('Segoe UI', FONT_SIZE_SMALL)
-    
     info_x = width - scale(280)
     
     # Floor count
-    floor_label = font.render(f"Floors: {floors}", True, TEXT_PRIMARY)
+    floor_label = text_cache.render(f"Floors: {floors}", TEXT_PRIMARY, FONT_SIZE_MEDIUM, bold=True)
     win.blit(floor_label, (info_x, panel_y + scale(15)))
     
     # Current tool
-    tool_label = font.render(f"Tool: {current_tool}", True, YELLOW)
+    tool_label = text_cache.render(f"Tool: {current_tool}", YELLOW, FONT_SIZE_MEDIUM, bold=True)
     win.blit(tool_label, (info_x, panel_y + scale(40)))
     
     # Status
     status_bg = pygame.Rect(info_x - scale(10), panel_y + scale(68), scale(260), scale(30))
     pygame.draw.rect(win, (35, 40, 52), status_bg, border_radius=scale(5))
-    status_surf = small_font.render(f"Status: {status[:35]}", True, ACCENT)
+    status_surf = text_cache.render(f"Status: {status[:35]}", ACCENT, FONT_SIZE_SMALL)
     win.blit(status_surf, (info_x - scale(5), panel_y + scale(74)))
     
     # Legend (bottom)
     legend_y = panel_y + scale(105)
-    legend_font = pygame.font.SysFont('Segoe UI', FONT_SIZE_SMALL)
     
     # Elevator legend
     pygame.draw.rect(win, BLUE, (scale(25), legend_y, scale(12), scale(12)), border_radius=2)
-    win.blit(legend_font.render("Elevator", True, TEXT_SECONDARY), (scale(42), legend_y - scale(2)))
+    win.blit(text_cache.render("Elevator", TEXT_SECONDARY, FONT_SIZE_SMALL), (scale(42), legend_y - scale(2)))
     
     # Stairs legend
     pygame.draw.rect(win, STAIRS_COLOR, (scale(110), legend_y, scale(12), scale(12)), border_radius=2)
-    win.blit(legend_font.render("Stairs", True, TEXT_SECONDARY), (scale(127), legend_y - scale(2)))
+    win.blit(text_cache.render("Stairs", TEXT_SECONDARY, FONT_SIZE_SMALL), (scale(127), legend_y - scale(2)))
     
     # Path legend
     pygame.draw.rect(win, PURPLE, (scale(185), legend_y, scale(12), scale(12)), border_radius=2)
-    win.blit(legend_font.render("Path", True, TEXT_SECONDARY), (scale(202), legend_y - scale(2)))
+    win.blit(text_cache.render("Path", TEXT_SECONDARY, FONT_SIZE_SMALL), (scale(202), legend_y - scale(2)))
     
     # Title
-    title_font = pygame.font.SysFont('Segoe UI', FONT_SIZE_LARGE, bold=True)
     title = "🤖 Robot Pathfinding Simulator"
-    title_surf = title_font.render(title, True, ACCENT)
+    title_surf = text_cache.render(title, ACCENT, FONT_SIZE_LARGE, bold=True)
     win.blit(title_surf, (scale(25), scale(8)))
+
+
+class FrameRenderer:
+    """Retained-mode renderer that repaints only what changed.
+
+    The full scene lives on an off-screen ``base`` surface. Each frame,
+    cells whose color changed (tracked by the grid store), the UI panel (when
+    its state changed) and the robot's old and new areas are refreshed, and
+    only those rects are pushed with ``pygame.display.update``.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.base = pygame.Surface(screen.get_size())
+        self.store = None
+        self.panel_state = None
+        self.robot_rect = None
+        self.full = True
+
+    def invalidate(self):
+        """Force a full repaint on the next frame (resize, expose, new grid)"""
+        self.full = True
+
+    def render(self, grid, floors, floor_width, tile_size, robot, buttons, current_tool, status):
+        buttons = list(buttons)
+        width, height = self.screen.get_size()
+        store = grid[0][0][0].store
+        if store is not self.store:
+            if self.store is not None:
+                self.store.dirty = None
+            self.store = store
+            store.track_changes()
+            self.full = True
+
+        panel_state = (floors, current_tool, status,
+                       tuple((b.is_hovered, b.is_active) for b in buttons))
+
+        if self.full:
+            if self.base.get_size() != (width, height):
+                self.base = pygame.Surface((width, height))
+            self.base.fill(BG_DARK)
+            draw_grid(self.base, grid, floors, floor_width, tile_size)
+            draw_ui_panel(self.base, buttons, floors, current_tool, status, WINDOW_WIDTH, WINDOW_HEIGHT)
+            store.drain_dirty()
+            self.panel_state = panel_state
+            self.full = False
+            self.screen.blit(self.base, (0, 0))
+            robot.draw(self.screen)
+            self.robot_rect = robot.get_rect() if robot.visible else None
+            pygame.display.flip()
+            return
+
+        views = store.views
+        rects = draw_cells(self.base, [views[i] for i in store.drain_dirty()],
+                           floor_width, tile_size)
+
+        if panel_state != self.panel_state:
+            self.panel_state = panel_state
+            # Rebuild the panel area from the bottom layer up (clipped)
+            panel_rect = pygame.Rect(scale(10), GRID_HEIGHT + scale(25),
+                                     WINDOW_WIDTH - scale(20), UI_PANEL_HEIGHT - scale(10))
+            self.base.set_clip(panel_rect)
+            self.base.fill(BG_DARK)
+            for f in range(floors):
+                draw_floor_background(self.base, f, floor_width)
+            draw_ui_panel(self.base, buttons, floors, current_tool, status, WINDOW_WIDTH, WINDOW_HEIGHT)
+            self.base.set_clip(None)
+            rects.append(panel_rect)
+
+        robot_rect = robot.get_rect() if robot.visible else None
+        rects += [r for r in (self.robot_rect, robot_rect) if r]
+        self.robot_rect = robot_rect
+
+        for rect in rects:
+            self.screen.blit(self.base, rect, rect)
+        robot.draw(self.screen)
+        if rects:
+            pygame.display.update(rects)